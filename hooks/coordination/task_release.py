@@ -13,22 +13,32 @@ Output: JSON {} (always succeeds)
 """
 
 import argparse
+import asyncio
 import json
 import os
-import subprocess
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
 # Logging
 LOG_DIR = Path(os.environ.get("METRICS_DIR", "/tmp/claude-metrics"))
-LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "coordination.log"
 
 # Session state file for tracking active task claims (shared with task_claim.py)
 TASK_CLAIMS_FILE = LOG_DIR / "active_task_claims.json"
 
 
+_log_dir_ready = False
+
+
+def _ensure_log_dir():
+    """Create LOG_DIR on first write instead of at import time."""
+    global _log_dir_ready
+    if not _log_dir_ready:
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        _log_dir_ready = True
+
+
 def get_timestamp() -> str:
     """Get ISO timestamp."""
     return datetime.now(timezone.utc).isoformat()
@@ -37,6 +47,7 @@ def get_timestamp() -> str:
 def log(msg: str):
     """Log message to coordination log file."""
     try:
+        _ensure_log_dir()
         with open(LOG_FILE, "a") as f:
             f.write(f"{get_timestamp()} [task_release] {msg}\n")
     except Exception:
@@ -72,42 +83,47 @@ def load_active_claims() -> dict:
 def save_active_claims(claims: dict):
     """Save active task claims to state file."""
     try:
+        _ensure_log_dir()
         with open(TASK_CLAIMS_FILE, "w") as f:
             json.dump(claims, f, indent=2)
     except Exception as e:
         log(f"Error saving claims: {e}")
 
 
-def call_claims_release(issue_id: str, claimant: str) -> dict:
+async def _run_claude_flow(args: list[str], timeout: int = 10) -> tuple[bool, str]:
+    """Run a claude-flow CLI command without blocking the event loop.
+
+    Returns (success, output). Raises asyncio.TimeoutError on timeout.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        "npx",
+        "-y",
+        "claude-flow@latest",
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=str(Path.home()),
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+
+    output = stdout.decode(errors="replace").strip() or stderr.decode(errors="replace").strip()
+    return proc.returncode == 0, output
+
+
+async def call_claims_release(issue_id: str, claimant: str) -> dict:
     """Call claude-flow claims_release via CLI.
 
     Returns dict with success status.
     """
     try:
-        cmd = [
-            "npx",
-            "-y",
-            "claude-flow@latest",
-            "claims",
-            "release",
-            "--issueId",
-            issue_id,
-            "--claimant",
-            claimant,
-        ]
-
         log(f"Releasing claim: {issue_id}")
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10,
-            cwd=str(Path.home()),
-        )
-
-        output = result.stdout.strip() or result.stderr.strip()
-        success = result.returncode == 0
+        success, output = await _run_claude_flow(["claims", "release", "--issueId", issue_id, "--claimant", claimant])
 
         if success:
             log(f"Release successful for {issue_id}")
@@ -119,7 +135,7 @@ def call_claims_release(issue_id: str, claimant: str) -> dict:
             "output": output,
         }
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         log(f"Release timeout for {issue_id}")
         return {"success": False, "error": "timeout"}
     except Exception as e:
@@ -127,41 +143,29 @@ def call_claims_release(issue_id: str, claimant: str) -> dict:
         return {"success": False, "error": str(e)}
 
 
-def call_hooks_notify(message: str, data: dict) -> dict:
+async def call_hooks_notify(message: str, data: dict) -> dict:
     """Call claude-flow hooks_notify via CLI.
 
     Broadcasts task completion to all agents.
     """
     try:
-        cmd = [
-            "npx",
-            "-y",
-            "claude-flow@latest",
-            "hooks",
-            "notify",
-            "--message",
-            message,
-            "--target",
-            "all",
-            "--priority",
-            "normal",
-            "--data",
-            json.dumps(data),
-        ]
-
         log(f"Broadcasting: {message[:50]}...")
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10,
-            cwd=str(Path.home()),
+        success, output = await _run_claude_flow(
+            [
+                "hooks",
+                "notify",
+                "--message",
+                message,
+                "--target",
+                "all",
+                "--priority",
+                "normal",
+                "--data",
+                json.dumps(data),
+            ]
         )
 
-        output = result.stdout.strip() or result.stderr.strip()
-        success = result.returncode == 0
-
         if success:
             log("Broadcast successful")
         else:
@@ -172,7 +176,7 @@ def call_hooks_notify(message: str, data: dict) -> dict:
             "output": output,
         }
 
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         log("Broadcast timeout")
         return {"success": False, "error": "timeout"}
     except Exception as e:
@@ -180,6 +184,48 @@ def call_hooks_notify(message: str, data: dict) -> dict:
         return {"success": False, "error": str(e)}
 
 
+async def _release_and_notify(claim: dict, agent_id: str, session_id: str) -> bool:
+    """Release one claim and broadcast its completion. Returns True if released."""
+    issue_id = claim.get("issue_id")
+    claimant = claim.get("claimant")
+    description = claim.get("description", "unknown task")
+    task_id = claim.get("task_id", "unknown")
+
+    if not issue_id or not claimant:
+        log(f"Skipping invalid claim: {claim}")
+        return False
+
+    # Release the claim
+    release_result = await call_claims_release(issue_id, claimant)
+
+    if not release_result.get("success"):
+        log(f"Failed to release task {task_id}: {release_result.get('error', 'unknown')}")
+        return False
+
+    # Broadcast completion
+    notify_result = await call_hooks_notify(
+        message=f"Task completed: {description[:100]}",
+        data={
+            "task_id": task_id,
+            "event": "completed",
+            "description": description,
+            "agent_id": agent_id,
+            "session_id": session_id,
+            "completed_at": get_timestamp(),
+        },
+    )
+
+    notify_ok = notify_result.get("success")
+    log(f"Released and broadcast task {task_id}: release=True, notify={notify_ok}")
+    return True
+
+
+async def _dispatch(active_claims: list[dict], agent_id: str, session_id: str) -> int:
+    """Release all claims concurrently. Returns the number released."""
+    results = await asyncio.gather(*(_release_and_notify(claim, agent_id, session_id) for claim in active_claims))
+    return sum(results)
+
+
 def on_subagent_stop(hook_input: dict) -> dict:
     """Handle SubagentStop - release task claims and broadcast completion.
 
@@ -188,6 +234,9 @@ def on_subagent_stop(hook_input: dict) -> dict:
     2. Release each claim via claims_release
     3. Broadcast completion via hooks_notify
     4. Clear claims from state file
+
+    Claims are released concurrently, so wall-clock time is bounded by the
+    slowest release+notify pair rather than their sum.
     """
     # Extract agent_id if available (for logging)
     agent_id = hook_input.get("agent_id", "unknown")
@@ -205,41 +254,7 @@ def on_subagent_stop(hook_input: dict) -> dict:
 
     log(f"Found {len(active_claims)} active task claims to release")
 
-    released_count = 0
-    for claim in active_claims:
-        issue_id = claim.get("issue_id")
-        claimant = claim.get("claimant")
-        description = claim.get("description", "unknown task")
-        task_id = claim.get("task_id", "unknown")
-
-        if not issue_id or not claimant:
-            log(f"Skipping invalid claim: {claim}")
-            continue
-
-        # Release the claim
-        release_result = call_claims_release(issue_id, claimant)
-
-        if release_result.get("success"):
-            released_count += 1
-
-            # Broadcast completion
-            notify_result = call_hooks_notify(
-                message=f"Task completed: {description[:100]}",
-                data={
-                    "task_id": task_id,
-                    "event": "completed",
-                    "description": description,
-                    "agent_id": agent_id,
-                    "session_id": session_id,
-                    "completed_at": get_timestamp(),
-                },
-            )
-
-            release_ok = release_result.get("success")
-            notify_ok = notify_result.get("success")
-            log(f"Released and broadcast task {task_id}: release={release_ok}, notify={notify_ok}")
-        else:
-            log(f"Failed to release task {task_id}: {release_result.get('error', 'unknown')}")
+    released_count = asyncio.run(_dispatch(active_claims, agent_id, session_id))
 
     # Clear all claims from state file
     save_active_claims({"claims": []})
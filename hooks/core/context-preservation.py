@@ -36,6 +36,11 @@ AGENT_SUGGESTIONS = {
     ),
 }
 
+# Suggestion text is fixed at import time; build it once
+_SUGGESTIONS_STR = "Suggested agents for delegation:\n" + "\n".join(
+    f"  - {agent}: {desc}" for agent, desc in AGENT_SUGGESTIONS.values()
+)
+
 
 def estimate_context_usage(transcript_path: str) -> dict:
     """Estimate context usage from transcript file."""
@@ -71,10 +76,7 @@ def get_context_percentage(estimated_tokens: int) -> int:
 
 def format_agent_suggestions() -> str:
     """Format agent suggestions as readable list."""
-    lines = ["Suggested agents for delegation:"]
-    for _key, (agent, desc) in AGENT_SUGGESTIONS.items():
-        lines.append(f"  - {agent}: {desc}")
-    return "\n".join(lines)
+    return _SUGGESTIONS_STR
 
 
 def save_context_stats(estimated_tokens: int, context_pct: int, metrics: dict) -> None:
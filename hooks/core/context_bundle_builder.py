@@ -9,6 +9,7 @@ ENV VARIABLES:
     CLAUDE_PROJECT_NAME: Project identifier (default: "unknown")
 """
 
+import contextlib
 import json
 import os
 import sys
@@ -25,6 +26,11 @@ except ImportError:
     QuestDBMetrics = None
     _metrics_writer = None
 
+try:
+    from hook_state import record_tool_start
+except ImportError:
+    record_tool_start = None
+
 
 def get_session_id(input_data):
     """Get the current session ID from input data or fallback"""
@@ -132,6 +138,11 @@ def record_operation():
         # Read input from stdin
         input_data = json.loads(sys.stdin.read())
 
+        # Record start time for post-tool-use duration tracking
+        if record_tool_start is not None and input_data.get("tool_name"):
+            with contextlib.suppress(Exception):
+                record_tool_start(get_session_id(input_data), input_data["tool_name"])
+
         # Extract operation details
         operation_type = "unknown"
         tool_details = {}
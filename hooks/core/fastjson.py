@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Fast JSON helpers for hook entrypoints.
+
+Prefers orjson (parses bytes directly, C implementation) and falls back to
+the stdlib json module when it is not installed.
+
+USAGE:
+    from core import fastjson          # hooks/intelligence/*
+    import fastjson                    # hooks/core/*
+
+    hook_input = fastjson.load_stdin()
+    fastjson.emit({"additionalContext": "..."})
+    fastjson.dump_file(STATE_FILE, state)   # atomic replace
+"""
+
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+# Imported by name so the optional module types as Any whether or not it is
+# installed (mypyc builds of the hooks type-check this module)
+try:
+    orjson: Any = importlib.import_module("orjson")
+except ImportError:
+    orjson = None
+
+JSONDecodeError = orjson.JSONDecodeError if orjson is not None else json.JSONDecodeError
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes (compact, or 2-space indented)."""
+    if orjson is not None:
+        data: bytes = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        return data
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def load_stdin() -> Any:
+    """Parse JSON from stdin, reading raw bytes when a binary buffer exists."""
+    buffer = getattr(sys.stdin, "buffer", None)
+    return loads(buffer.read() if buffer is not None else sys.stdin.read())
+
+
+def write_stdout(data: bytes):
+    """Write pre-serialized JSON bytes plus newline to stdout."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(data.decode() + "\n")
+        return
+    sys.stdout.flush()  # Keep ordering with any text already printed
+    buffer.write(data + b"\n")
+    buffer.flush()
+
+
+def emit(obj: Any):
+    """Serialize obj and write it to stdout as one line."""
+    write_stdout(dumps(obj))
+
+
+def write_atomic(path: Path, data: bytes):
+    """Replace path with data atomically (per-process tmp file + os.replace).
+
+    Readers see the old or the new content, never a torn write. There is
+    deliberately no fsync: these are caches and hook state, and losing the
+    last update on power failure is acceptable.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+
+
+def dump_file(path: Path, obj: Any):
+    """Serialize obj (compact) and write it to path atomically."""
+    write_atomic(path, dumps(obj))
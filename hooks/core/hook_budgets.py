@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Hook Budgets - Per-hook wall-clock limits enforced by run_safe.py.
+
+A hook that exceeds its budget is abandoned and Claude receives an empty
+response, so one stuck hook cannot hold up the next prompt for the full
+settings.json timeout. Hooks not listed get DEFAULT_BUDGET.
+
+USAGE:
+    from hook_budgets import get_budget, is_slow
+
+    budget = get_budget("/path/to/lesson_injector.py")   # 6.0
+"""
+
+from pathlib import Path
+
+DEFAULT_BUDGET = 9.0  # Just under the 10s timeout in settings
+
+# Hook file name -> budget in seconds
+BUDGETS = {
+    "framework-detector.py": 0.5,
+    "lesson_injector.py": 6.0,  # Above its 5s search deadline, so the search (and its CLI) is stopped first
+    "ci_status_injector.py": 2.0,
+    "post-tool-use.py": 3.0,
+}
+
+# Runs longer than this fraction of the budget are logged as SLOW
+SLOW_FRACTION = 0.5
+
+
+def get_budget(hook_path: str) -> float:
+    """Return the time budget (seconds) for a hook path."""
+    return BUDGETS.get(Path(hook_path).name, DEFAULT_BUDGET)
+
+
+def is_slow(elapsed: float, budget: float) -> bool:
+    """True if a run used more than SLOW_FRACTION of its budget."""
+    return elapsed > budget * SLOW_FRACTION
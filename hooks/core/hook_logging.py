@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Hook Logging - File loggers that cost nothing until the first record.
+
+``logging.basicConfig(filename=...)`` creates the log directory and opens the
+file at import, on every hook invocation, even when nothing is logged. The
+logger returned here creates the directory and opens the file on first emit.
+
+USAGE:
+    from core.hook_logging import get_file_logger
+
+    logger = get_file_logger(__name__, LOG_FILE)
+"""
+
+import logging
+from pathlib import Path
+
+DEFAULT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class LazyFileHandler(logging.FileHandler):
+    """FileHandler that creates the parent directory and opens the file on first emit."""
+
+    def __init__(self, filename: Path):
+        super().__init__(filename, delay=True)
+        self._path = Path(filename)
+
+    def _open(self):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+def get_file_logger(name: str, log_file: Path, fmt: str = DEFAULT_FORMAT, level: int = logging.INFO) -> logging.Logger:
+    """Return a logger writing to log_file through a LazyFileHandler (installed once)."""
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    if not any(isinstance(h, LazyFileHandler) for h in logger.handlers):
+        handler = LazyFileHandler(log_file)
+        handler.setFormatter(logging.Formatter(fmt))
+        logger.addHandler(handler)
+        logger.propagate = False
+    return logger
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Hook State Store - Shared scratch state for short-lived hook processes.
+
+Replaces per-call temp files (e.g. claude_tool_start_<session>_<tool>) with a
+single SQLite database on tmpfs (/dev/shm on Linux, tempdir fallback), so a
+PreToolUse/PostToolUse pair costs two in-memory upserts instead of a file
+create + unlink.
+
+USAGE:
+    from hook_state import pop_tool_start, record_tool_start
+
+    record_tool_start(session_id, tool_name)           # PreToolUse
+    start_ns = pop_tool_start(session_id, tool_name)   # PostToolUse
+
+    # Coalesce repetitive successful reads into one metrics row
+    add_read_sample(session_id, "Read", duration_ms, os.getcwd())
+    rows = claim_read_aggregates()
+    for row_id, session, tool, cwd, count, sum_ms, max_ms in rows:
+        ...
+    if writer.flush():
+        delete_read_aggregates([row[0] for row in rows])
+"""
+
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+_SHM_DIR = Path("/dev/shm")
+STATE_DB = (_SHM_DIR if _SHM_DIR.is_dir() else Path(tempfile.gettempdir())) / "claude_hook_state.db"
+
+# Flush a read aggregate after this many samples or this much time
+AGG_MAX_COUNT = 50
+AGG_MAX_AGE_NS = 5_000_000_000
+
+# Claimed aggregates not deleted within this time (failed write, crashed hook)
+# are claimed again by the next flush
+AGG_CLAIM_TIMEOUT_NS = 30_000_000_000
+
+# Bumped when a table changes shape; older tables are scratch data and dropped
+_SCHEMA_VERSION = 1
+
+_conn: sqlite3.Connection | None = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Get or create the process-wide connection (autocommit, WAL)."""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(STATE_DB, isolation_level=None, timeout=1.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS read_agg")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS starts (session TEXT, tool TEXT, ts INTEGER, PRIMARY KEY (session, tool))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS read_agg (session TEXT, tool TEXT, cwd TEXT, count INTEGER, sum_ms INTEGER,"
+            " max_ms INTEGER, first_ts INTEGER, PRIMARY KEY (session, tool))"
+        )
+        # Aggregates taken out of read_agg for a write, kept until it succeeds
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS read_agg_claimed (id INTEGER PRIMARY KEY, session TEXT, tool TEXT,"
+            " cwd TEXT, count INTEGER, sum_ms INTEGER, max_ms INTEGER, claimed_ts INTEGER)"
+        )
+        _conn = conn
+    return _conn
+
+
+def record_tool_start(session_id: str, tool_name: str, ts_ns: int | None = None) -> None:
+    """Record the start time of a tool call (time.monotonic_ns(), system-wide on Linux)."""
+    _get_conn().execute(
+        "INSERT OR REPLACE INTO starts (session, tool, ts) VALUES (?, ?, ?)",
+        (str(session_id), str(tool_name), ts_ns if ts_ns is not None else time.monotonic_ns()),
+    )
+
+
+def pop_tool_start(session_id: str, tool_name: str) -> int | None:
+    """Return and remove the recorded start time (monotonic ns), or None if absent."""
+    conn = _get_conn()
+    key = (str(session_id), str(tool_name))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT ts FROM starts WHERE session = ? AND tool = ?", key).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM starts WHERE session = ? AND tool = ?", key)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row[0] if row else None
+
+
+def add_read_sample(session_id: str, tool_name: str, duration_ms: int, cwd: str = "", ts_ns: int | None = None) -> None:
+    """Add one successful call to the (session, tool) aggregate.
+
+    cwd is the hook's working directory, kept so the row can be tagged with
+    the right project when another session's hook writes it.
+    """
+    _get_conn().execute(
+        "INSERT INTO read_agg (session, tool, cwd, count, sum_ms, max_ms, first_ts) VALUES (?, ?, ?, 1, ?, ?, ?)"
+        " ON CONFLICT (session, tool) DO UPDATE SET count = count + 1, sum_ms = sum_ms + excluded.sum_ms,"
+        " max_ms = MAX(max_ms, excluded.max_ms)",
+        (
+            str(session_id),
+            str(tool_name),
+            cwd,
+            duration_ms,
+            duration_ms,
+            ts_ns if ts_ns is not None else time.monotonic_ns(),
+        ),
+    )
+
+
+def claim_read_aggregates(
+    session_id: str | None = None, now_ns: int | None = None
+) -> list[tuple[int, str, str, str, int, int, int]]:
+    """Claim the aggregates that are due for a write, for any session.
+
+    An aggregate is due once it holds AGG_MAX_COUNT samples or is older than
+    AGG_MAX_AGE_NS; every aggregate of session_id is due (error, other tool,
+    session end). Claims older than AGG_CLAIM_TIMEOUT_NS are taken again.
+    Claimed rows stay stored until delete_read_aggregates() is called for
+    them, so a failed write loses nothing.
+    Returns [(id, session, tool, cwd, count, sum_ms, max_ms), ...].
+    """
+    conn = _get_conn()
+    now = now_ns if now_ns is not None else time.monotonic_ns()
+    due = "session = ? OR count >= ? OR first_ts <= ?"
+    params = (str(session_id) if session_id is not None else None, AGG_MAX_COUNT, now - AGG_MAX_AGE_NS)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT INTO read_agg_claimed (session, tool, cwd, count, sum_ms, max_ms, claimed_ts)"
+            f" SELECT session, tool, cwd, count, sum_ms, max_ms, NULL FROM read_agg WHERE {due}",
+            params,
+        )
+        conn.execute(f"DELETE FROM read_agg WHERE {due}", params)
+        expired = (now - AGG_CLAIM_TIMEOUT_NS,)
+        rows = conn.execute(
+            "SELECT id, session, tool, cwd, count, sum_ms, max_ms FROM read_agg_claimed"
+            " WHERE claimed_ts IS NULL OR claimed_ts <= ?",
+            expired,
+        ).fetchall()
+        if rows:
+            conn.execute(
+                "UPDATE read_agg_claimed SET claimed_ts = ? WHERE claimed_ts IS NULL OR claimed_ts <= ?",
+                (now,) + expired,
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return rows
+
+
+def delete_read_aggregates(ids: list[int]) -> None:
+    """Drop claimed aggregates once their write has succeeded."""
+    if ids:
+        _get_conn().executemany("DELETE FROM read_agg_claimed WHERE id = ?", [(i,) for i in ids])
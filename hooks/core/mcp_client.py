@@ -5,33 +5,61 @@ Questo modulo fornisce un'interfaccia semplice per chiamare i comandi
 claude-flow CLI da hook Python.
 
 Comandi supportati:
-- memory store/retrieve/search/list
+- memory store/store_many/delete/retrieve/search/list
 - session save/restore/list
 - hooks intelligence trajectory-start/step/end
 - hooks intelligence pattern-store/search
 """
 
+import atexit
+import fcntl
 import json
 import logging
 import os
+import signal
 import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
-# Setup logging
+try:
+    from core import fastjson
+    from core.hook_logging import get_file_logger
+except ImportError:
+    # Imported from hooks/core itself
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson
+    from core.hook_logging import get_file_logger
+
+# Setup logging (directory and file are created on first emitted record,
+# so hooks that never log pay no filesystem cost at import)
 LOG_DIR = Path(os.environ.get("METRICS_DIR", "/tmp/claude-metrics"))
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-logging.basicConfig(
-    filename=LOG_DIR / "mcp_client.log",
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
-logger = logging.getLogger(__name__)
+logger = get_file_logger(__name__, LOG_DIR / "mcp_client.log", level=logging.DEBUG)
 
 
-def _run_claude_flow(args: list[str], timeout: int = 10) -> tuple[bool, str]:
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    """Kill a timed-out CLI process and everything it started, then reap it.
+
+    npx runs claude-flow as a child; killing only npx would leave that child
+    running after the hook exits. Processes are started with
+    start_new_session=True, so their pid is also their process group id.
+    """
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        proc.kill()
+    proc.communicate()
+
+
+def _run_claude_flow(args: list[str], timeout: float = 10) -> tuple[bool, str]:
     """Run claude-flow CLI command.
 
+    On timeout the whole process group is killed, so no CLI process outlives
+    the hook.
+
     Returns:
         tuple: (success, output)
     """
@@ -39,16 +67,22 @@ def _run_claude_flow(args: list[str], timeout: int = 10) -> tuple[bool, str]:
         cmd = ["npx", "-y", "claude-flow@latest"] + args
         logger.debug(f"Running: {' '.join(cmd)}")
 
-        result = subprocess.run(
+        proc = subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=timeout,
             cwd=str(Path.home()),
+            start_new_session=True,
         )
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_process_group(proc)
+            raise
 
-        output = result.stdout.strip() or result.stderr.strip()
-        success = result.returncode == 0
+        output = stdout.strip() or stderr.strip()
+        success = proc.returncode == 0
 
         if not success:
             logger.warning(f"Command failed: {output}")
@@ -65,7 +99,58 @@ def _run_claude_flow(args: list[str], timeout: int = 10) -> tuple[bool, str]:
         return False, str(e)
 
 
-def memory_store(key: str, value: Any, namespace: str = "") -> dict:
+def _run_claude_flow_many(arg_lists: list[list[str]], timeout: int = 10) -> list[tuple[bool, str]]:
+    """Run several claude-flow CLI commands concurrently.
+
+    npx startup dominates each call, so launching all processes before
+    waiting on any pays it once in wall-clock time instead of N times.
+
+    Returns:
+        list: (success, output) per command, in input order
+    """
+    procs: list[tuple[list[str], subprocess.Popen | None, str]] = []
+    for args in arg_lists:
+        cmd = ["npx", "-y", "claude-flow@latest"] + args
+        logger.debug(f"Running: {' '.join(cmd)}")
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                cwd=str(Path.home()),
+                start_new_session=True,
+            )
+            procs.append((args, proc, ""))
+        except Exception as e:
+            logger.error(f"Command error: {e}")
+            procs.append((args, None, str(e)))
+
+    deadline = time.monotonic() + timeout
+    results = []
+    for args, started, error in procs:
+        if started is None:
+            results.append((False, error))
+            continue
+
+        try:
+            stdout, stderr = started.communicate(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            _kill_process_group(started)
+            logger.error(f"Command timed out: {args}")
+            results.append((False, "timeout"))
+            continue
+
+        output = stdout.strip() or stderr.strip()
+        success = started.returncode == 0
+        if not success:
+            logger.warning(f"Command failed: {output}")
+        results.append((success, output))
+
+    return results
+
+
+def memory_store(key: str, value: Any, namespace: str = "", now: str | None = None) -> dict:
     """Store value in claude-flow memory.
 
     Writes directly to MCP store file (~/.claude-flow/memory/store.json)
@@ -74,7 +159,36 @@ def memory_store(key: str, value: Any, namespace: str = "") -> dict:
     full_key = f"{namespace}:{key}" if namespace else key
 
     # Use direct file access (same store as MCP server)
-    return _direct_memory_store(full_key, value)
+    return _direct_memory_store(full_key, value, now)
+
+
+def memory_store_many(
+    items: dict[str, Any],
+    namespace: str = "",
+    now: str | None = None,
+    delete: tuple[str, ...] = (),
+    append: dict[str, Any] | None = None,
+    keep_last: int = 0,
+) -> dict:
+    """Store several values with a single store write.
+
+    `delete` keys are removed and each `append` item is added to the list
+    stored at its key (trimmed to the last `keep_last` items when > 0), all
+    under the same lock - no separate retrieve is needed to grow a list.
+    """
+    prefix = f"{namespace}:" if namespace else ""
+    return _direct_memory_store_many(
+        {f"{prefix}{key}": value for key, value in items.items()},
+        now,
+        tuple(f"{prefix}{key}" for key in delete),
+        {f"{prefix}{key}": item for key, item in (append or {}).items()},
+        keep_last,
+    )
+
+
+def memory_delete(key: str, namespace: str = "") -> dict:
+    """Remove a key from claude-flow memory."""
+    return memory_store_many({}, namespace, delete=(key,))
 
 
 def memory_retrieve(key: str, namespace: str = "") -> Any:
@@ -163,21 +277,41 @@ def session_list() -> list[dict]:
 
 MCP_STORE_FILE = Path.home() / ".claude-flow" / "memory" / "store.json"
 
+# Pending access bookkeeping: retrieves are reads, so accessCount/lastAccessed
+# are aggregated in memory and written once at process exit.
+_access_deltas: dict[str, int] = {}
+_last_accessed: dict[str, str] = {}
+_flush_registered = False
+
 
 def _ensure_mcp_store():
     """Ensure MCP store file exists with correct structure."""
     MCP_STORE_FILE.parent.mkdir(parents=True, exist_ok=True)
     if not MCP_STORE_FILE.exists():
-        with open(MCP_STORE_FILE, "w") as f:
-            json.dump({"entries": {}}, f)
+        MCP_STORE_FILE.write_bytes(fastjson.dumps({"entries": {}}))
+
+
+@contextmanager
+def _store_lock(shared: bool = False) -> Iterator[None]:
+    """Serialize store.json access across concurrent hook processes.
+
+    Writers take an exclusive lock around load -> mutate -> save; readers take
+    a shared lock so they never observe a half-written file.
+    """
+    MCP_STORE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(MCP_STORE_FILE.with_suffix(".lock"), "w") as lf:
+        fcntl.flock(lf.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
 
 
 def _load_mcp_store() -> dict:
     """Load MCP store."""
     _ensure_mcp_store()
     try:
-        with open(MCP_STORE_FILE) as f:
-            data = json.load(f)
+        data = fastjson.loads(MCP_STORE_FILE.read_bytes())
         if "entries" not in data:
             data = {"entries": {}}
         return data
@@ -187,34 +321,73 @@ def _load_mcp_store() -> dict:
 
 
 def _save_mcp_store(data: dict):
-    """Save MCP store."""
-    _ensure_mcp_store()
-    with open(MCP_STORE_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    """Save MCP store (compact JSON, atomic replace so readers never see a partial file)."""
+    MCP_STORE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fastjson.dump_file(MCP_STORE_FILE, data)
 
 
-def _direct_memory_store(key: str, value: Any) -> dict:
+def _direct_memory_store(key: str, value: Any, now: str | None = None) -> dict:
     """Store directly to MCP memory file (same format as MCP server)."""
+    return _direct_memory_store_many({key: value}, now)
+
+
+def _as_list(value: Any) -> list:
+    """Return a stored list value (MCP may keep it as a JSON string); [] otherwise."""
+    if isinstance(value, str):
+        try:
+            value = fastjson.loads(value)
+        except fastjson.JSONDecodeError:
+            return []
+    return value if isinstance(value, list) else []
+
+
+def _direct_memory_store_many(
+    items: dict[str, Any],
+    now: str | None = None,
+    delete: tuple[str, ...] = (),
+    append: dict[str, Any] | None = None,
+    keep_last: int = 0,
+) -> dict:
+    """Store, delete and append to keys with one load/save of the MCP memory file.
+
+    store.json is rewritten whole on every save, so batching the keys of one
+    hook event pays that cost once instead of once per key. `now` lets a
+    caller reuse the timestamp it already took for this event.
+    """
     try:
-        from datetime import datetime, timezone
-
-        store = _load_mcp_store()
-        now = datetime.now(timezone.utc).isoformat()
-
-        # Handle both dict and string values (MCP stores some as JSON strings)
-        stored_value = value
-
-        store["entries"][key] = {
-            "key": key,
-            "value": stored_value,
-            "metadata": {},
-            "storedAt": now,
-            "accessCount": 0,
-            "lastAccessed": now,
-        }
-
-        _save_mcp_store(store)
-        logger.info(f"Stored to MCP store: {key}")
+        if now is None:
+            now = get_timestamp()
+
+        with _store_lock():
+            store = _load_mcp_store()
+            entries = store["entries"]
+            items = dict(items)
+            for key, item in (append or {}).items():
+                current = _as_list(entries.get(key, {}).get("value"))
+                current.append(item)
+                items[key] = current[-keep_last:] if keep_last > 0 else current
+            # Handle both dict and string values (MCP stores some as JSON strings)
+            for key, value in items.items():
+                entries[key] = {
+                    "key": key,
+                    "value": value,
+                    "metadata": {},
+                    "storedAt": now,
+                    "accessCount": 0,
+                    "lastAccessed": now,
+                }
+            for key in delete:
+                entries.pop(key, None)
+            _save_mcp_store(store)
+        for key in (*items, *delete):
+            # Fresh entries start at accessCount 0 and deleted ones are gone:
+            # drop stale pending touches
+            _access_deltas.pop(key, None)
+            _last_accessed.pop(key, None)
+        for key in items:
+            logger.info(f"Stored to MCP store: {key}")
+        for key in delete:
+            logger.info(f"Deleted from MCP store: {key}")
         return {"success": True, "direct": True}
     except Exception as e:
         logger.error(f"Direct store error: {e}")
@@ -224,14 +397,12 @@ def _direct_memory_store(key: str, value: Any) -> dict:
 def _direct_memory_retrieve(key: str) -> Any:
     """Retrieve directly from MCP memory file."""
     try:
-        store = _load_mcp_store()
+        with _store_lock(shared=True):
+            store = _load_mcp_store()
 
         if key in store["entries"]:
             entry = store["entries"][key]
-            # Update access count
-            entry["accessCount"] = entry.get("accessCount", 0) + 1
-            entry["lastAccessed"] = get_timestamp()
-            _save_mcp_store(store)
+            _record_access(key)
 
             logger.info(f"Retrieved from MCP store: {key}")
             value = entry.get("value")
@@ -239,8 +410,8 @@ def _direct_memory_retrieve(key: str) -> Any:
             # Handle JSON string values
             if isinstance(value, str):
                 try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
+                    return fastjson.loads(value)
+                except fastjson.JSONDecodeError:
                     return value
             return value
         return None
@@ -249,10 +420,49 @@ def _direct_memory_retrieve(key: str) -> Any:
         return None
 
 
+def _record_access(key: str):
+    """Queue an accessCount/lastAccessed update for the exit-time flush."""
+    global _flush_registered
+    _access_deltas[key] = _access_deltas.get(key, 0) + 1
+    _last_accessed[key] = get_timestamp()
+    if not _flush_registered:
+        atexit.register(_flush_access_deltas)
+        _flush_registered = True
+
+
+def _flush_access_deltas():
+    """Apply pending access updates to the MCP store with a single write.
+
+    If the process is killed before exit the counts are merely stale.
+    """
+    if not _access_deltas:
+        return
+    try:
+        with _store_lock():
+            store = _load_mcp_store()
+            entries = store["entries"]
+            changed = False
+            for key, count in _access_deltas.items():
+                entry = entries.get(key)
+                if entry is None:
+                    continue
+                entry["accessCount"] = entry.get("accessCount", 0) + count
+                entry["lastAccessed"] = _last_accessed.get(key, entry.get("lastAccessed"))
+                changed = True
+            if changed:
+                _save_mcp_store(store)
+    except Exception as e:
+        logger.error(f"Flush access counts error: {e}")
+    finally:
+        _access_deltas.clear()
+        _last_accessed.clear()
+
+
 def _direct_memory_list() -> list[str]:
     """List keys from MCP memory file."""
     try:
-        store = _load_mcp_store()
+        with _store_lock(shared=True):
+            store = _load_mcp_store()
         return list(store["entries"].keys())
     except Exception:
         return []
@@ -267,24 +477,29 @@ _fallback_memory_list = _direct_memory_list
 # Utility functions
 
 
+_project_name: str | None = None
+
+
 def get_project_name() -> str:
-    """Get current project name from environment or cwd."""
+    """Get current project name from environment or cwd.
+
+    Finds the repo root by walking up to the nearest ``.git`` entry instead of
+    spawning ``git rev-parse``; the result is cached for the process lifetime.
+    """
+    global _project_name
+
     if project := os.environ.get("CLAUDE_PROJECT"):
         return project
 
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            return Path(result.stdout.strip()).name
-    except Exception:
-        pass
+    if _project_name is None:
+        cwd = Path.cwd()
+        _project_name = cwd.name
+        for parent in (cwd, *cwd.parents):
+            if (parent / ".git").exists():
+                _project_name = parent.name
+                break
 
-    return Path.cwd().name
+    return _project_name
 
 
 def get_timestamp() -> str:
@@ -350,8 +565,8 @@ def trajectory_end(trajectory_id: str, success_flag: bool) -> dict:
     return {"success": success, "output": output}
 
 
-def pattern_store(pattern: str, pattern_type: str, confidence: float, metadata: dict | None = None) -> dict:
-    """Store a learned pattern."""
+def _pattern_store_args(pattern: str, pattern_type: str, confidence: float, metadata: dict | None) -> list[str]:
+    """Build CLI args for hooks intelligence pattern-store."""
     args = [
         "hooks",
         "intelligence",
@@ -367,12 +582,27 @@ def pattern_store(pattern: str, pattern_type: str, confidence: float, metadata:
     if metadata:
         args.extend(["--metadata", json.dumps(metadata)])
 
-    success, output = _run_claude_flow(args)
+    return args
+
+
+def pattern_store(pattern: str, pattern_type: str, confidence: float, metadata: dict | None = None) -> dict:
+    """Store a learned pattern."""
+    success, output = _run_claude_flow(_pattern_store_args(pattern, pattern_type, confidence, metadata))
     return {"success": success, "output": output}
 
 
-def pattern_search(query: str, top_k: int = 3, min_confidence: float = 0.7) -> list[dict]:
-    """Search learned patterns."""
+def pattern_store_batch(items: list[tuple[str, str, float, dict | None]]) -> list[dict]:
+    """Store several learned patterns at once.
+
+    Each item is (pattern, pattern_type, confidence, metadata); results are
+    returned in the same order, shaped like pattern_store().
+    """
+    results = _run_claude_flow_many([_pattern_store_args(*item) for item in items])
+    return [{"success": success, "output": output} for success, output in results]
+
+
+def pattern_search(query: str, top_k: int = 3, min_confidence: float = 0.7, timeout: float = 10) -> list[dict]:
+    """Search learned patterns ([] on failure or after timeout seconds)."""
     success, output = _run_claude_flow(
         [
             "hooks",
@@ -384,7 +614,8 @@ def pattern_search(query: str, top_k: int = 3, min_confidence: float = 0.7) -> l
             str(top_k),
             "--min-confidence",
             str(min_confidence),
-        ]
+        ],
+        timeout=timeout,
     )
 
     if not success:
@@ -3,112 +3,221 @@
 PostToolUse Hook: Log tool usage and detect error patterns (Multi-Project Template)
 
 This hook is called after each Claude Code tool execution. It:
-1. Calculates tool duration from PreToolUse start time
+1. Calculates tool duration from PreToolUse start time (hook_state store)
 2. Logs tool usage to QuestDB (time-series)
 3. Detects error patterns (tdd_block, timeout, etc.)
-4. Records events for recurring pattern detection
+4. Records error events for recurring pattern detection (event_type tag on
+   the tool usage row, plus the claude_events row existing queries read)
+5. Coalesces successful Read/Grep/Glob/LS calls into one row per
+   AGG_MAX_COUNT calls or AGG_MAX_AGE_NS (hook_state store); errors and other
+   tools are written immediately and flush the session's pending aggregates.
+   Every call also writes the due aggregates of any session, and aggregates
+   are deleted from the store only once the write succeeded.
+
+Also register it for Stop and SessionEnd: there it writes the session's
+remaining aggregates (the trailing reads no later PostToolUse would flush).
 
 Database:
     QuestDB via ILP protocol (replaces PostgreSQL)
-    - claude_tool_usage table: Individual tool invocations
-    - claude_events table: Error and block tracking
+    - claude_tool_usage table: Individual tool invocations, one row per call;
+      errors/blocks are tagged with event_type on the same row
+    - claude_events table: Error and block tracking (still written until the
+      dashboards reading it move to claude_tool_usage.event_type)
 
 ENV VARIABLES:
     QUESTDB_HOST: QuestDB host (default: localhost)
     QUESTDB_ILP_PORT: QuestDB ILP port (default: 9009)
+    QUESTDB_PROTO: "tcp" or "http" (gzip ILP/HTTP on QUESTDB_HTTP_PORT, default 9000)
+
+Timestamps:
+    Rows are timestamped by the writer: microseconds over ILP/HTTP
+    (precision=us), nanoseconds over ILP/TCP. Durations are whole ms.
 
 Returns:
     JSON response: {"success": True} to confirm logging completed
 """
 
-import json
+import functools
+import os
 import re
 import sys
-import tempfile
-from datetime import datetime
+import time
 from pathlib import Path
+from typing import Any
 
-# Add shared scripts to path for QuestDB import
-scripts_dir = Path(__file__).resolve().parent.parent.parent / "scripts"
-sys.path.insert(0, str(scripts_dir))
-
+# Guarded: the hook must still run when copied on its own (README "Option B")
 try:
-    from questdb_metrics import QuestDBMetrics
+    from fastjson import JSONDecodeError, emit, load_stdin, write_stdout
 except ImportError:
-    # Fail gracefully if QuestDB not available
-    QuestDBMetrics = None
+    import json
+    from json import JSONDecodeError
+
+    def load_stdin() -> Any:
+        """Parse JSON from stdin."""
+        return json.load(sys.stdin)
+
+    def write_stdout(data: bytes):
+        """Write pre-serialized JSON bytes plus newline to stdout."""
+        sys.stdout.buffer.write(data + b"\n")
+        sys.stdout.buffer.flush()
+
+    def emit(obj: Any):
+        """Serialize obj and write it to stdout as one line."""
+        write_stdout(json.dumps(obj, separators=(",", ":")).encode())
+
+
+# Precompiled patterns (hooks run once per tool call, keep the hot path cheap)
+_ERROR_KEYWORDS = re.compile(r"tdd|test|timeout|hook|blocked", re.IGNORECASE)
+
+# Fixed responses, serialized once (written with a single stdout write)
+_OK = b'{"success":true}'
+_NOT_CONFIGURED = b'{"success":true,"note":"QuestDB not configured"}'
+
+# Successful calls of these tools are aggregated instead of written one by one
+_AGGREGATED_TOOLS = frozenset({"Read", "Grep", "Glob", "LS"})
+
+# Hook events that only flush the session's aggregates
+_SESSION_END_EVENTS = frozenset({"Stop", "SessionEnd"})
+
+# Keyword -> (priority, event_type); lower priority wins when several keywords match
+_ERROR_EVENT_TYPES = {
+    "tdd": (0, "tdd_block"),
+    "test": (0, "tdd_block"),
+    "timeout": (1, "timeout"),
+    "hook": (2, "hook_block"),
+    "blocked": (2, "hook_block"),
+}
+
+
+def classify_error(error: str) -> str:
+    """Map an error message to an event type with a single regex pass."""
+    matches = {m.lower() for m in _ERROR_KEYWORDS.findall(error)}
+    if not matches:
+        return "error"
+    return min(_ERROR_EVENT_TYPES[m] for m in matches)[1]
+
+
+@functools.lru_cache(maxsize=1)
+def _get_writer_class():
+    """Import QuestDBMetrics on first use; None if QuestDB is not available.
+
+    Deferred so malformed/incomplete input exits before paying for the
+    sys.path mutation and module import.
+    """
+    # Add shared scripts to path for QuestDB import
+    scripts_dir = Path(__file__).resolve().parent.parent.parent / "scripts"
+    sys.path.insert(0, str(scripts_dir))
+    try:
+        from questdb_metrics import QuestDBMetrics
+    except ImportError:
+        # Fail gracefully if QuestDB not available
+        return None
+    return QuestDBMetrics
+
+
+@functools.lru_cache(maxsize=16)
+def _project_for(cwd: str) -> str | None:
+    """Project of an aggregate sampled in cwd; None for the writer's own project."""
+    if not cwd or cwd == os.getcwd():
+        return None
+    from questdb_metrics import get_project_name
+
+    project: str = get_project_name(cwd)
+    return project
+
 
 # Read hook input with error handling
 try:
-    hook_data = json.loads(sys.stdin.read())
-except json.JSONDecodeError as e:
-    print(json.dumps({"success": False, "error": f"Invalid JSON: {e}"}))
+    hook_data = load_stdin()
+except JSONDecodeError as e:
+    emit({"success": False, "error": f"Invalid JSON: {e}"})
     sys.exit(0)  # Exit 0 to not block Claude
 
 session_id = hook_data.get("session_id")
 tool_name = hook_data.get("tool_name")
 success = hook_data.get("success", True)
 error = hook_data.get("error")
+session_end = hook_data.get("hook_event_name") in _SESSION_END_EVENTS
 
 # Validate required fields
-if not session_id or not tool_name:
-    print(json.dumps({"success": False, "error": "Missing session_id or tool_name"}))
+if not session_id or not (tool_name or session_end):
+    emit({"success": False, "error": "Missing session_id or tool_name"})
     sys.exit(0)
 
-# Sanitize file path components
-safe_session = re.sub(r"[^a-zA-Z0-9\-_]", "_", str(session_id))
-safe_tool = re.sub(r"[^a-zA-Z0-9\-_]", "_", str(tool_name))
-
-# Calculate duration using cross-platform temp directory
-temp_dir = tempfile.gettempdir()
-start_file = Path(temp_dir) / f"claude_tool_start_{safe_session}_{safe_tool}"
-
+# Calculate duration from the start time recorded by PreToolUse
+# (monotonic ns: integer math, immune to wall-clock/NTP adjustments)
 duration_ms = 0
-if start_file.exists():
+if not session_end:
     try:
-        start_time = datetime.fromisoformat(start_file.read_text().strip())
-        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-        start_file.unlink()  # Cleanup
-    except (ValueError, OSError):
+        from hook_state import pop_tool_start
+
+        start_ns = pop_tool_start(session_id, tool_name)
+        if start_ns is not None:
+            duration_ms = max(0, (time.monotonic_ns() - start_ns) // 1_000_000)
+    except Exception:
         pass
 
-# Log to QuestDB
+# Coalesce repetitive successful reads; anything else (error, other tool,
+# session end) flushes all of the session's aggregates. Due aggregates of
+# other sessions are written along.
+aggregate = not session_end and success and tool_name in _AGGREGATED_TOOLS
+try:
+    from hook_state import add_read_sample, claim_read_aggregates
+
+    if aggregate:
+        add_read_sample(session_id, tool_name, duration_ms, os.getcwd())
+    pending_aggregates = claim_read_aggregates(None if aggregate else session_id)
+except Exception:
+    # State store unavailable: write this call as a plain row
+    aggregate = False
+    pending_aggregates = []
+
+write_tool_row = not (aggregate or session_end)
+if not write_tool_row and not pending_aggregates:
+    write_stdout(_OK)
+    sys.exit(0)
+
+# Log to QuestDB (claimed aggregates stay in the store if this fails and are
+# claimed again later)
+QuestDBMetrics = _get_writer_class()
 if QuestDBMetrics is not None:
     try:
         writer = QuestDBMetrics()
 
-        # Log tool usage
-        writer.log_tool_use(
-            session_id=session_id,
-            tool_name=tool_name,
-            duration_ms=duration_ms,
-            success=success,
-            error=error[:200] if error else None,
-        )
-
-        # Detect and log error events
-        if not success and error:
-            error_lower = error.lower()
-            if "tdd" in error_lower or "test" in error_lower:
-                event_type = "tdd_block"
-            elif "timeout" in error_lower:
-                event_type = "timeout"
-            elif "hook" in error_lower or "blocked" in error_lower:
-                event_type = "hook_block"
-            else:
-                event_type = "error"
-
-            writer.log_event(
-                session_id=session_id, event_type=event_type, tool_name=tool_name, error_message=error[:200]
+        if write_tool_row:
+            # Detect error events (tagged on the tool usage row and, for existing
+            # claude_events readers, logged there too - same flush, one write)
+            event_type = classify_error(error) if not success and error else None
+
+            writer.buffer_tool_use(
+                session_id=session_id,
+                tool_name=tool_name,
+                duration_ms=duration_ms,
+                success=success,
+                error=error[:200] if error else None,
+                event_type=event_type,
             )
+            if event_type:
+                writer.buffer_event(
+                    session_id=session_id, event_type=event_type, tool_name=tool_name, error_message=error[:200]
+                )
+
+        for _row_id, agg_session, agg_tool, cwd, count, sum_ms, max_ms in pending_aggregates:
+            writer.buffer_tool_aggregate(agg_session, agg_tool, count, sum_ms, max_ms, project_name=_project_for(cwd))
+
+        if writer.flush() and pending_aggregates:
+            from hook_state import delete_read_aggregates
+
+            delete_read_aggregates([row[0] for row in pending_aggregates])
+        writer.close()
 
-        print(json.dumps({"success": True}))
+        write_stdout(_OK)
 
     except Exception as e:
         # Don't fail hook on QuestDB errors
-        print(json.dumps({"success": False, "error": str(e)}))
+        emit({"success": False, "error": str(e)})
 else:
     # QuestDB not available, but don't block
-    print(json.dumps({"success": True, "note": "QuestDB not configured"}))
+    write_stdout(_NOT_CONFIGURED)
 
 sys.exit(0)
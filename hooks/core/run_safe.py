@@ -6,76 +6,207 @@ Usage in settings.json:
     "command": "python3 /path/to/run_safe.py /path/to/actual_hook.py"
 
 Passes stdin to the hook and captures any errors, logging them for debugging.
+
+Python hooks are executed in-process with runpy (no second interpreter
+start-up); other executables still run as a subprocess.
+
+Each hook runs under its own time budget (hook_budgets.BUDGETS); runs over
+half their budget are logged with a "SLOW:" prefix.
 """
 
-import json
+import _thread
+import atexit
+import io
+import os
+import runpy
+import signal
 import subprocess
 import sys
+import threading
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
 
+# Guarded: run_safe.py must keep answering {} even when copied without its
+# hooks/core siblings (README "Option B")
+try:
+    from fastjson import write_stdout
+except ImportError:
+
+    def write_stdout(data: bytes):
+        """Write pre-serialized JSON bytes plus newline to stdout."""
+        sys.stdout.buffer.write(data + b"\n")
+        sys.stdout.buffer.flush()
+
+
+try:
+    from hook_budgets import DEFAULT_BUDGET, get_budget, is_slow
+except ImportError:
+    DEFAULT_BUDGET = 9.0  # Just under the 10s timeout in settings
+
+    def get_budget(hook_path: str) -> float:
+        """Return the time budget (seconds) for a hook path."""
+        return float(DEFAULT_BUDGET)
+
+    def is_slow(elapsed: float, budget: float) -> bool:
+        """True if a run used more than half its budget."""
+        return elapsed > budget * 0.5
+
+
 LOG_FILE = Path.home() / ".claude" / "metrics" / "hook_errors.log"
+TIMEOUT_SECONDS = DEFAULT_BUDGET  # Budget for hooks without an entry in hook_budgets
 
+# Empty hook response, serialized once
+_EMPTY = b"{}"
 
-def log_error(hook_path: str, error: str, stderr: str = ""):
-    """Log error to file for debugging."""
+# Log directory created and O_APPEND fd opened once per process, on first error
+_log_fd: int | None = None
+
+
+class HookTimeout(BaseException):
+    """Raised in the main thread when an in-process hook exceeds its budget.
+
+    Derives from BaseException so hooks' own ``except Exception`` handlers
+    cannot swallow it.
+    """
+
+
+def _on_alarm(signum, frame):
+    raise HookTimeout()
+
+
+def run_in_process(
+    hook_path: str, hook_args: list[str], stdin_data: bytes, timeout: float = TIMEOUT_SECONDS
+) -> tuple[bytes, str, int]:
+    """Run a Python hook in this interpreter as ``__main__``.
+
+    Returns (stdout, stderr, exit_code). Raises HookTimeout after `timeout`
+    seconds (sub-second precision via setitimer).
+    """
+    stdin = io.TextIOWrapper(io.BytesIO(stdin_data), encoding="utf-8")
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+    stderr = io.StringIO()
+
+    saved = sys.argv, sys.stdin, sys.stdout, sys.stderr, list(sys.path)
+    sys.argv = [hook_path] + hook_args
+    sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+    # Match `python3 hook.py`: the hook's directory comes first on sys.path
+    sys.path.insert(0, str(Path(hook_path).resolve().parent))
+
+    use_alarm = hasattr(signal, "SIGALRM")
+    timer = None
+    if use_alarm:
+        old_handler = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    else:
+        timer = threading.Timer(timeout, _thread.interrupt_main)
+        timer.start()
+
+    exit_code = 0
     try:
+        runpy.run_path(hook_path, run_name="__main__")
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except KeyboardInterrupt:
+        if timer is None:
+            raise
+        raise HookTimeout() from None
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, old_handler)
+        elif timer is not None:
+            timer.cancel()
+        sys.argv, sys.stdin, sys.stdout, sys.stderr, sys.path[:] = saved
+
+    stdout.flush()
+    return stdout.buffer.getvalue(), stderr.getvalue(), exit_code
+
+
+def _close_log():
+    """Close the log fd at exit."""
+    global _log_fd
+    if _log_fd is not None:
+        os.close(_log_fd)
+        _log_fd = None
+
+
+def _get_log_fd() -> int:
+    """Return the append-only log fd, opening it on first use."""
+    global _log_fd
+    if _log_fd is None:
         LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(LOG_FILE, "a") as f:
-            f.write(f"\n[{datetime.now().isoformat()}] {hook_path}\n")
-            f.write(f"Error: {error}\n")
-            if stderr:
-                f.write(f"Stderr: {stderr}\n")
-            f.write("-" * 50 + "\n")
+        _log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        atexit.register(_close_log)
+    return _log_fd
+
+
+def log_error(hook_path: str, error: str, stderr: str = ""):
+    """Log error to file for debugging (one append write per record)."""
+    try:
+        record = f"\n[{datetime.now().isoformat()}] {hook_path}\nError: {error}\n"
+        if stderr:
+            record += f"Stderr: {stderr}\n"
+        record += "-" * 50 + "\n"
+        os.write(_get_log_fd(), record.encode())
     except Exception:
         pass
 
 
 def main():
     if len(sys.argv) < 2:
-        print(json.dumps({}))
+        write_stdout(_EMPTY)
         sys.exit(0)
 
     hook_path = sys.argv[1]
     hook_args = sys.argv[2:]
+    budget = get_budget(hook_path)
 
     try:
-        # Read stdin to pass to hook
-        stdin_data = sys.stdin.read()
+        # Read stdin to pass to hook (raw bytes, no decode/encode round trip)
+        stdin_data = sys.stdin.buffer.read()
 
         # Run the actual hook
-        # Use python3 explicitly for .py files to avoid permission/shebang issues
-        cmd = ["python3", hook_path] + hook_args if hook_path.endswith(".py") else [hook_path] + hook_args
-
-        result = subprocess.run(
-            cmd,
-            input=stdin_data,
-            capture_output=True,
-            text=True,
-            timeout=9,  # Just under the 10s timeout in settings
-        )
+        started = time.perf_counter()
+        if hook_path.endswith(".py"):
+            stdout, stderr, returncode = run_in_process(hook_path, hook_args, stdin_data, budget)
+        else:
+            result = subprocess.run(
+                [hook_path] + hook_args,
+                input=stdin_data,
+                capture_output=True,
+                timeout=budget,
+            )
+            stdout, returncode = result.stdout, result.returncode
+            stderr = result.stderr.decode("utf-8", errors="replace")
+        elapsed = time.perf_counter() - started
 
         # Pass through stdout (the hook's output)
-        if result.stdout:
-            print(result.stdout, end="")
+        if stdout:
+            sys.stdout.buffer.write(stdout)
+            sys.stdout.buffer.flush()
         else:
-            print(json.dumps({}))
+            write_stdout(_EMPTY)
 
         # Log stderr if any (for debugging)
-        if result.stderr:
-            log_error(hook_path, f"returncode={result.returncode}", result.stderr)
+        if stderr:
+            log_error(hook_path, f"returncode={returncode}", stderr)
+
+        # Make latency regressions visible before they hit the budget
+        if is_slow(elapsed, budget):
+            log_error(hook_path, f"SLOW: {elapsed:.3f}s of {budget}s budget")
 
         sys.exit(0)
 
-    except subprocess.TimeoutExpired:
-        log_error(hook_path, "Timeout (9s)")
-        print(json.dumps({}))
+    except (subprocess.TimeoutExpired, HookTimeout):
+        log_error(hook_path, f"Timeout ({budget}s)")
+        write_stdout(_EMPTY)
         sys.exit(0)
 
     except Exception as e:
         log_error(hook_path, str(e) + "\n" + traceback.format_exc())
-        print(json.dumps({}))
+        write_stdout(_EMPTY)
         sys.exit(0)
 
 
@@ -13,39 +13,94 @@ Usage in hook:
         safe_main(main)
 """
 
+import atexit
 import json
+import os
+import queue
 import sys
+import threading
 import traceback
+from datetime import datetime
 from pathlib import Path
 
 LOG_FILE = Path.home() / ".claude" / "metrics" / "hook_errors.log"
 
+# Error log writes happen on a background thread, drained at exit
+_LOG_Q: queue.SimpleQueue = queue.SimpleQueue()
+_log_thread: threading.Thread | None = None
+
+# Log directory created and O_APPEND fd opened once per process, on first error
+_log_fd: int | None = None
+
+
+def _get_log_fd() -> int:
+    """Return the append-only log fd, opening it on first use."""
+    global _log_fd
+    if _log_fd is None:
+        LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    return _log_fd
+
+
+def _drain():
+    """Write queued (timestamp, hook_name, exception) records to LOG_FILE."""
+    while True:
+        item = _LOG_Q.get()
+        if item is None:
+            return
+        try:
+            timestamp, hook_name, exc = item
+            record = "".join(
+                (
+                    f"\n[{timestamp}] {hook_name}\n",
+                    f"Error: {exc}\n",
+                    *traceback.format_exception(type(exc), exc, exc.__traceback__),
+                    "-" * 50 + "\n",
+                )
+            )
+            os.write(_get_log_fd(), record.encode())
+        except Exception:
+            pass  # Even logging failed, just continue
+
+
+def _stop_logger():
+    """Flush pending log records and close the log fd before the interpreter exits."""
+    global _log_fd
+    if _log_thread is not None:
+        _LOG_Q.put(None)
+        _log_thread.join(timeout=2)
+    if _log_fd is not None:
+        os.close(_log_fd)
+        _log_fd = None
+
+
+def _queue_error(hook_name: str, exc: BaseException):
+    """Hand an error to the background logger (formatting happens there)."""
+    global _log_thread
+    if _log_thread is None:
+        _log_thread = threading.Thread(target=_drain, name="hook-error-log", daemon=True)
+        _log_thread.start()
+        atexit.register(_stop_logger)
+    _LOG_Q.put_nowait((datetime.now().isoformat(), hook_name, exc))
+
 
 def safe_main(hook_func, hook_name: str = "unknown"):
     """
     Wrap a hook's main function with comprehensive error handling.
 
     Ensures the hook NEVER raises an exception - always exits cleanly.
-    Logs errors to ~/.claude/metrics/hook_errors.log for debugging.
+    Logs errors to ~/.claude/metrics/hook_errors.log for debugging; the
+    traceback is formatted and written off the exit path by a daemon thread.
     """
     try:
         hook_func()
     except Exception as e:
-        # Log error for debugging
-        try:
-            LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-            with open(LOG_FILE, "a") as f:
-                from datetime import datetime
-
-                f.write(f"\n[{datetime.now().isoformat()}] {hook_name}\n")
-                f.write(f"Error: {e}\n")
-                f.write(traceback.format_exc())
-                f.write("-" * 50 + "\n")
-        except Exception:
-            pass  # Even logging failed, just continue
+        # Log error for debugging (written by the background logger)
+        _queue_error(hook_name, e)
 
-        # Exit cleanly with empty JSON (success)
-        print(json.dumps({}))
+        # Exit cleanly with empty JSON (success); flush so Claude gets the
+        # response before the log write completes at exit
+        print(json.dumps({}), flush=True)
         sys.exit(0)
 
 
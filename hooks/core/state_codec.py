@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+State Codec - Compact encoding for hook-to-hook state files.
+
+Uses msgpack (binary, no text parsing) when installed and falls back to JSON
+via fastjson otherwise. Paths are given by their legacy ``.json`` name; the
+file actually used carries SUFFIX, and a legacy JSON file is still read (and
+removed on the next write) so existing installs migrate transparently.
+
+Only for files whose readers all go through this module - files read by
+other tools (e.g. session_state.json) stay plain JSON.
+
+USAGE:
+    from core import state_codec
+
+    state_codec.dump(STATS_FILE, stats)
+    stats = state_codec.load(STATS_FILE)   # None if missing
+"""
+
+import importlib
+import sys
+from pathlib import Path
+from typing import Any
+
+# Imported by name so the optional module types as Any whether or not it is installed
+try:
+    msgpack: Any = importlib.import_module("msgpack")
+except ImportError:
+    msgpack = None
+
+try:
+    from core import fastjson
+except ImportError:
+    # Imported from hooks/core itself
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson
+
+SUFFIX = ".msgpack" if msgpack is not None else ".json"
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode obj to bytes."""
+    if msgpack is not None:
+        data: bytes = msgpack.packb(obj, use_bin_type=True)
+    else:
+        data = fastjson.dumps(obj)
+    return data
+
+
+def loads(data: bytes) -> Any:
+    """Decode bytes produced by dumps(). Raises ValueError on corrupt data."""
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    return fastjson.loads(data)
+
+
+def state_path(path: Path) -> Path:
+    """Return the on-disk path for a state file given by its .json name."""
+    return path.with_suffix(SUFFIX)
+
+
+def load(path: Path) -> Any:
+    """Load a state file, falling back to its legacy JSON form; None if missing.
+
+    Raises ValueError on corrupt data and OSError on read errors.
+    """
+    current = state_path(path)
+    try:
+        return loads(current.read_bytes())
+    except FileNotFoundError:
+        if current == path:
+            return None
+    try:
+        return fastjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def dump(path: Path, obj: Any) -> None:
+    """Write a state file atomically (fastjson.write_atomic) and drop the legacy JSON."""
+    current = state_path(path)
+    fastjson.write_atomic(current, dumps(obj))
+    if current != path:
+        path.unlink(missing_ok=True)
+
+
+def unlink(path: Path) -> None:
+    """Remove a state file in both its current and legacy form."""
+    state_path(path).unlink(missing_ok=True)
+    path.unlink(missing_ok=True)
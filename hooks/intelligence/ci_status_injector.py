@@ -9,13 +9,30 @@ Table: ci_status (in n8n database)
 Written by: N8N GitHub CI Status Notifier workflow
 
 Security: Uses parameterized queries to prevent SQL injection.
+
+Uses psycopg (one lazily opened autocommit connection) when installed,
+otherwise falls back to the psql CLI with variables passed via -v.
 """
 
-import json
 import os
 import re
+import string
 import subprocess
 import sys
+from pathlib import Path
+
+try:
+    from core import fastjson
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson
+
+try:
+    import psycopg
+    from psycopg.rows import dict_row
+except ImportError:
+    psycopg = None
 
 # PostgreSQL connection - credentials from environment only (no defaults)
 PG_HOST = os.getenv("PG_HOST", "localhost")
@@ -26,8 +43,56 @@ PG_DB = os.getenv("PG_DB", "n8n")
 
 MAX_AGE_HOURS = 24  # Ignore status older than this
 
-# Regex for valid GitHub repo format: owner/repo
-VALID_REPO_PATTERN = re.compile(r"^[a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+$")
+# Empty hook response, serialized once
+_EMPTY = b"{}"
+
+# Select and mark pending rows in one statement: one round trip, and rows
+# locked by a concurrent hook are skipped so each status is injected once
+FETCH_AND_MARK_QUERY = """
+    UPDATE ci_status SET injected = TRUE
+    WHERE id IN (
+        SELECT id FROM ci_status
+        WHERE repo = %s
+          AND injected = FALSE
+          AND created_at > NOW() - %s * INTERVAL '1 hour'
+        ORDER BY created_at DESC
+        LIMIT 5
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, repo, repo_name, branch, pr_number, conclusion,
+              run_url, message, pending_action, created_at
+"""
+
+# psql fallback: same statement with psql variables (interpolated by psql, quoted)
+PSQL_FETCH_AND_MARK_QUERY = """
+WITH t AS (
+    UPDATE ci_status SET injected = TRUE
+    WHERE id IN (
+        SELECT id FROM ci_status
+        WHERE repo = :'repo_param'
+          AND injected = FALSE
+          AND created_at > NOW() - :'max_age_param'::int * INTERVAL '1 hour'
+        ORDER BY created_at DESC
+        LIMIT 5
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, repo, repo_name, branch, pr_number, conclusion,
+              run_url, message, pending_action, created_at
+)
+SELECT json_agg(row_to_json(t) ORDER BY t.created_at DESC) FROM t;
+"""
+
+# Opened on first use so hooks that exit early never connect
+_conn = None
+
+
+# Valid GitHub repo format: owner/repo with [a-zA-Z0-9_.-] on each side.
+# Deleting the allowed characters must leave exactly the single "/".
+_REPO_SAFE_DELETE = str.maketrans("", "", string.ascii_letters + string.digits + "_.-")
+
+
+# owner/repo from https://github.com/owner/repo(.git) and git@github.com:owner/repo(.git)
+_REMOTE_RE = re.compile(r"github\.com[:/]([a-zA-Z0-9_.-]+/[a-zA-Z0-9_.-]+?)(?:\.git)?/?$")
 
 
 def sanitize_repo(repo: str) -> str | None:
@@ -38,47 +103,120 @@ def sanitize_repo(repo: str) -> str | None:
     # Strip whitespace
     repo = repo.strip()
 
-    # Validate format: must be owner/repo with safe characters only
-    if not VALID_REPO_PATTERN.match(repo):
+    # Additional safety: max length (checked first, it is the cheapest test)
+    if len(repo) > 200:
         return None
 
-    # Additional safety: max length
-    if len(repo) > 200:
+    # Validate format: must be owner/repo with safe characters only
+    # (one C-level translate pass instead of a regex match)
+    if repo.translate(_REPO_SAFE_DELETE) != "/" or repo[0] == "/" or repo[-1] == "/":
         return None
 
     return repo
 
 
+def _read_origin_url() -> str | None:
+    """Read remote.origin.url straight from .git/config (no git subprocess).
+
+    Returns None when no .git directory is found; raises LookupError when
+    .git is a file (worktree/submodule) so the caller can ask git instead.
+    """
+    cwd = Path.cwd()
+    for parent in (cwd, *cwd.parents):
+        git_dir = parent / ".git"
+        if git_dir.is_dir():
+            break
+        if git_dir.exists():
+            raise LookupError("gitdir indirection")
+    else:
+        return None
+
+    in_origin = False
+    for raw in (git_dir / "config").read_text(errors="replace").splitlines():
+        line = raw.strip()
+        if line.startswith("["):
+            in_origin = line == '[remote "origin"]'
+        elif in_origin:
+            key, sep, value = line.partition("=")
+            if sep and key.strip() == "url":
+                return value.strip()
+    return None
+
+
+def _git_origin_url() -> str | None:
+    """Ask git for remote.origin.url (handles worktrees and includes)."""
+    result = subprocess.run(
+        ["git", "config", "--get", "remote.origin.url"],
+        capture_output=True,
+        text=True,
+        timeout=5,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
 def get_current_repo() -> str | None:
     """Get current repository from git remote."""
     try:
-        result = subprocess.run(
-            ["git", "config", "--get", "remote.origin.url"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            url = result.stdout.strip()
-            # Extract owner/repo from various URL formats
-            # https://github.com/owner/repo.git
-            # git@github.com:owner/repo.git
-            if "github.com" in url:
-                if url.startswith("git@"):
-                    # git@github.com:owner/repo.git
-                    repo = url.split(":")[-1].replace(".git", "")
-                else:
-                    # https://github.com/owner/repo.git
-                    parts = url.split("github.com/")[-1].replace(".git", "")
-                    repo = parts
-                return sanitize_repo(repo)
+        try:
+            url = _read_origin_url()
+        except LookupError:
+            url = _git_origin_url()
+        # Extract owner/repo from https and ssh URL formats in one pass
+        m = _REMOTE_RE.search(url) if url else None
+        if m:
+            return sanitize_repo(m.group(1))
     except Exception:
         pass
     return None
 
 
-def query_ci_status(repo: str) -> list[dict]:
-    """Query pending CI status for repo from PostgreSQL using parameterized query."""
+def _get_conn() -> "psycopg.Connection | None":
+    """Return the shared psycopg connection, connecting on first use.
+
+    Returns None if psycopg is not installed or the connection fails.
+    """
+    global _conn
+    if psycopg is None:
+        return None
+    if _conn is None or _conn.closed:
+        try:
+            _conn = psycopg.connect(
+                host=PG_HOST,
+                port=PG_PORT,
+                user=PG_USER,
+                password=PG_PASS,
+                dbname=PG_DB,
+                autocommit=True,
+                connect_timeout=5,
+            )
+        except Exception:
+            _conn = None
+    return _conn
+
+
+def _run_psql(query: str, variables: dict[str, str], user: str, password: str) -> subprocess.CompletedProcess:
+    """Run query through psql as user, passing values as psql variables.
+
+    The query is fed on stdin: psql does not interpolate variables in -c.
+    """
+    cmd = ["psql", "-h", PG_HOST, "-p", PG_PORT, "-U", user, "-d", PG_DB, "-t", "-A", "-q"]
+    for name, value in variables.items():
+        cmd += ["-v", f"{name}={value}"]
+    return subprocess.run(
+        cmd,
+        input=query,
+        capture_output=True,
+        text=True,
+        timeout=10,
+        env={**os.environ, "PGPASSWORD": password},
+    )
+
+
+def fetch_and_mark(repo: str) -> list[dict]:
+    """Fetch pending CI statuses for repo and mark them injected (one-time).
+
+    Single parameterized UPDATE ... RETURNING, newest first.
+    """
     # Credentials check
     if not PG_USER or not PG_PASS:
         return []
@@ -88,153 +226,73 @@ def query_ci_status(repo: str) -> list[dict]:
     if not safe_repo:
         return []
 
+    conn = _get_conn()
+    if conn is not None:
+        try:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute(FETCH_AND_MARK_QUERY, (safe_repo, MAX_AGE_HOURS))
+                # RETURNING has no ORDER BY
+                return sorted(cur.fetchall(), key=lambda row: row["created_at"], reverse=True)
+        except Exception:
+            return []
+
     try:
-        # Use psql with -v to pass variable safely (prevents SQL injection)
-        # The variable is then referenced as :'varname' in the query
-        query = """
-        SELECT json_agg(row_to_json(t))
-        FROM (
-            SELECT id, repo, repo_name, branch, pr_number, conclusion,
-                   run_url, message, pending_action, created_at
-            FROM ci_status
-            WHERE repo = :'repo_param'
-              AND injected = FALSE
-              AND created_at > NOW() - INTERVAL '24 hours'
-            ORDER BY created_at DESC
-            LIMIT 5
-        ) t;
-        """
-
-        result = subprocess.run(
-            [
-                "psql",
-                "-h",
-                PG_HOST,
-                "-p",
-                PG_PORT,
-                "-U",
-                PG_USER,
-                "-d",
-                PG_DB,
-                "-v",
-                f"repo_param={safe_repo}",  # Safe parameter passing
-                "-t",  # Tuples only
-                "-A",  # Unaligned
-                "-c",
-                query,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            env={**os.environ, "PGPASSWORD": PG_PASS},
+        result = _run_psql(
+            PSQL_FETCH_AND_MARK_QUERY,
+            {"repo_param": safe_repo, "max_age_param": str(MAX_AGE_HOURS)},
+            PG_USER,
+            PG_PASS,
         )
 
         if result.returncode == 0 and result.stdout.strip():
-            data = json.loads(result.stdout.strip())
+            data = fastjson.loads(result.stdout.strip())
             return data if data else []
     except Exception:
         pass
     return []
 
 
-def mark_as_injected(ids: list[int]) -> None:
-    """Mark CI status records as injected using safe integer list."""
-    if not ids:
-        return
+_CONCLUSION_EMOJI = {"success": "✅", "failure": "❌"}
+_ACTION_SUFFIX = {"merge": " - ready to merge!", "fix": " - needs fix"}
 
-    # Credentials check
-    if not PG_USER or not PG_PASS:
-        return
 
-    # Validate all IDs are positive integers (prevents injection)
-    try:
-        safe_ids = [int(i) for i in ids if isinstance(i, (int, float)) and i > 0]
-        if not safe_ids:
-            return
-    except (ValueError, TypeError):
-        return
-
-    try:
-        # Safe: ids_str contains only validated integers
-        ids_str = ",".join(str(i) for i in safe_ids)
-        query = f"UPDATE ci_status SET injected = TRUE WHERE id IN ({ids_str});"
-
-        subprocess.run(
-            [
-                "psql",
-                "-h",
-                PG_HOST,
-                "-p",
-                PG_PORT,
-                "-U",
-                PG_USER,
-                "-d",
-                PG_DB,
-                "-c",
-                query,
-            ],
-            capture_output=True,
-            timeout=10,
-            env={**os.environ, "PGPASSWORD": PG_PASS},
-        )
-    except Exception:
-        pass
+def _format_one(s: dict) -> str:
+    """Format a single CI status line."""
+    emoji = _CONCLUSION_EMOJI.get(s.get("conclusion", "unknown"), "⚠️")
+    pr_number = s.get("pr_number")
+    pr = f" #{pr_number}" if pr_number else ""
+    suffix = _ACTION_SUFFIX.get(s.get("pending_action") or "", "")
+    return f"{emoji} CI{pr} on {s.get('repo_name', 'repo')}{suffix}"
 
 
 def format_status(statuses: list[dict]) -> str:
     """Format CI statuses for injection."""
-    parts = []
-
-    for s in statuses:
-        conclusion = s.get("conclusion", "unknown")
-        pr_number = s.get("pr_number")
-        repo_name = s.get("repo_name", "repo")
-        pending_action = s.get("pending_action")
-
-        emoji = "✅" if conclusion == "success" else "❌" if conclusion == "failure" else "⚠️"
-
-        status_parts = [f"{emoji} CI"]
-        if pr_number:
-            status_parts.append(f"#{pr_number}")
-        status_parts.append(f"on {repo_name}")
-
-        if pending_action == "merge":
-            status_parts.append("- ready to merge!")
-        elif pending_action == "fix":
-            status_parts.append("- needs fix")
-
-        parts.append(" ".join(status_parts))
-
-    return " | ".join(parts)
+    return " | ".join(_format_one(s) for s in statuses)
 
 
 def main():
     try:
-        _input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        print(json.dumps({}))
+        _input_data = fastjson.load_stdin()
+    except fastjson.JSONDecodeError:
+        fastjson.write_stdout(_EMPTY)
         sys.exit(0)
 
     # Get current repo (already sanitized)
     current_repo = get_current_repo()
     if not current_repo:
-        print(json.dumps({}))
+        fastjson.write_stdout(_EMPTY)
         sys.exit(0)
 
-    # Query pending CI statuses for this repo
-    statuses = query_ci_status(current_repo)
+    # Fetch pending CI statuses for this repo (marked injected in the same statement)
+    statuses = fetch_and_mark(current_repo)
     if not statuses:
-        print(json.dumps({}))
+        fastjson.write_stdout(_EMPTY)
         sys.exit(0)
 
     # Format and output
     formatted = format_status(statuses)
     output = {"additionalContext": f"[{formatted}]"}
-    print(json.dumps(output))
-
-    # Mark as injected (one-time)
-    ids = [s["id"] for s in statuses if s.get("id")]
-    mark_as_injected(ids)
+    fastjson.emit(output)
 
     sys.exit(0)
 
@@ -15,31 +15,63 @@ Outputs context suggestion for Claude to use appropriate commands.
 """
 
 import contextlib
-import json
+import functools
 import os
 import sys
 from pathlib import Path
 
+try:
+    from core import fastjson
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson
+
+
+def _entry_names(path: Path | str) -> set[str]:
+    """Names in a directory (one getdents per call); empty set if unreadable."""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return set()
+
+
+@functools.lru_cache(maxsize=64)
+def _scan_indicators(cwd: str) -> tuple[bool, bool, bool]:
+    """Walk cwd and its parents (excluding root) for framework indicators.
+
+    Returns (has_specs, has_planning, has_claude_validation). One directory
+    listing per level instead of three stat() probes; stops early once all
+    indicators are found or at the repository root (the level holding .git).
+    Memoized per cwd.
+    """
+    has_specs = has_planning = has_claude_validation = False
+
+    level = Path(cwd)
+    while True:
+        names = _entry_names(level)
+        has_specs = has_specs or "specs" in names
+        has_planning = has_planning or ".planning" in names
+        if not has_claude_validation and ".claude" in names:
+            has_claude_validation = "validation" in _entry_names(level / ".claude")
+
+        if has_specs and has_planning and has_claude_validation:
+            break
+        if ".git" in names:  # Repository root bounds the detection scope
+            break
+        level = level.parent
+        if level == level.parent:  # Until root
+            break
+
+    return has_specs, has_planning, has_claude_validation
+
 
 def detect_framework(cwd: str) -> dict:
     """Detect framework based on directory structure."""
-    cwd_path = Path(cwd)
-
-    # Check for framework indicators
-    has_specs = (cwd_path / "specs").exists()
-    has_planning = (cwd_path / ".planning").exists()
-    has_claude_validation = (cwd_path / ".claude" / "validation").exists()
-
-    # Also check parent directories (in case we're in a subdirectory)
-    parent = cwd_path.parent
-    while parent != parent.parent:  # Until root
-        if (parent / "specs").exists():
-            has_specs = True
-        if (parent / ".planning").exists():
-            has_planning = True
-        if (parent / ".claude" / "validation").exists():
-            has_claude_validation = True
-        parent = parent.parent
+    # Check for framework indicators in cwd and parent directories
+    # (in case we're in a subdirectory)
+    has_specs, has_planning, has_claude_validation = _scan_indicators(cwd)
 
     # Determine framework
     frameworks = []
@@ -105,7 +137,7 @@ def detect_framework(cwd: str) -> dict:
 def main():
     """Main hook function - called as UserPromptSubmit hook."""
     with contextlib.suppress(Exception):
-        json.load(sys.stdin)  # Consume stdin for hook protocol
+        fastjson.load_stdin()  # Consume stdin for hook protocol
 
     # Get current working directory
     cwd = os.getcwd()
@@ -126,7 +158,7 @@ def main():
             "message": detection["context_message"],
         }
 
-    print(json.dumps(output))
+    fastjson.emit(output)
 
 
 if __name__ == "__main__":
@@ -15,10 +15,13 @@ Output (stdout JSON):
     {"additionalContext": "[Lessons from past sessions]\n- ..."}
 """
 
-import json
+import itertools
 import logging
 import os
+import subprocess
 import sys
+import tempfile
+import time
 from pathlib import Path
 
 # Setup logging
@@ -36,6 +39,23 @@ CONFIDENCE_HIGH = 0.8
 CONFIDENCE_MEDIUM = 0.5
 MAX_LESSONS = 3
 
+# Empty hook response, serialized once
+_EMPTY = b"{}"
+
+# pattern_search budget on a cache miss. Every search starts `npx -y
+# claude-flow@latest` (npx startup, registry check, CLI load: 1-3s cold), so a
+# sub-second budget would kill practically every search. The CLI process is
+# killed at the deadline, so nothing outlives the hook.
+SEARCH_TIMEOUT_SECONDS = 5.0
+
+# Search results cached across hook processes on tmpfs, keyed by prompt prefix.
+# A fresh entry is served without starting a process; a stale one is served
+# and refreshed by a detached background search.
+_SHM_DIR = Path("/dev/shm")
+CACHE_FILE = (_SHM_DIR if _SHM_DIR.is_dir() else Path(tempfile.gettempdir())) / "claude_lesson_cache.json"
+CACHE_TTL_SECONDS = 3600
+CACHE_MAX_ENTRIES = 256
+
 # Import mcp_client functions with fallback
 try:
     from core.mcp_client import get_project_name, pattern_search
@@ -50,11 +70,84 @@ except ImportError:
             """Fallback: get project name from cwd."""
             return Path.cwd().name
 
-        def pattern_search(query: str, top_k: int = 3, min_confidence: float = 0.7) -> list[dict]:
+        def pattern_search(query: str, top_k: int = 3, min_confidence: float = 0.7, timeout: float = 10) -> list[dict]:
             """Fallback: return empty patterns."""
             return []
 
 
+try:
+    from core import fastjson
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson
+
+
+def _cache_key(query: str) -> str:
+    """Cache key for a search query: first 100 chars, lowercased and stripped."""
+    return query.lower().strip()[:100]
+
+
+def _load_cache() -> dict:
+    """Load the search cache ({} if missing or unreadable)."""
+    try:
+        data = fastjson.loads(CACHE_FILE.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _store_patterns(query: str, patterns: list[dict]) -> None:
+    """Cache a search result, keeping the CACHE_MAX_ENTRIES most recent entries."""
+    cache = _load_cache()
+    cache.pop(_cache_key(query), None)
+    cache[_cache_key(query)] = {"ts": time.time(), "patterns": patterns}
+    if len(cache) > CACHE_MAX_ENTRIES:
+        cache = dict(itertools.islice(cache.items(), len(cache) - CACHE_MAX_ENTRIES, None))
+    try:
+        fastjson.dump_file(CACHE_FILE, cache)
+    except OSError as e:
+        logger.warning(f"Could not write lesson cache: {e}")
+
+
+def _refresh_in_background(query: str) -> None:
+    """Re-run the search in a detached process that updates the cache."""
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--refresh", query],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except OSError as e:
+        logger.warning(f"Could not start background lesson search: {e}")
+
+
+def _search(query: str, timeout: float) -> list[dict]:
+    """pattern_search with the hook's settings; non-empty results are cached."""
+    patterns: list[dict] = pattern_search(
+        query=query,
+        top_k=5,  # Get a few more to filter
+        min_confidence=CONFIDENCE_MEDIUM,  # Only medium+ confidence
+        timeout=timeout,
+    )
+    # [] also means failure or timeout, so only real results are cached
+    if patterns:
+        _store_patterns(query, patterns)
+    return patterns
+
+
+def find_patterns(query: str) -> list[dict]:
+    """Patterns for query: from the cache when possible, else a bounded search."""
+    entry = _load_cache().get(_cache_key(query))
+    if isinstance(entry, dict) and isinstance(cached := entry.get("patterns"), list):
+        if time.time() - entry.get("ts", 0) > CACHE_TTL_SECONDS:
+            _refresh_in_background(query)
+        return cached
+    return _search(query, SEARCH_TIMEOUT_SECONDS)
+
+
 def extract_context(hook_input: dict) -> tuple[str, str]:
     """Extract prompt and project context from hook input.
 
@@ -116,39 +209,33 @@ def process_hook(hook_input: dict) -> dict:
 
         # Build search query from prompt context
         # Use first 100 chars of prompt to focus the search
-        search_query = prompt[:100] if len(prompt) > 100 else prompt
+        search_query = prompt[:100]
 
-        # Search for relevant patterns
+        # Search for relevant patterns (cached across prompts)
         logger.debug(f"Searching patterns for project={project}, query={search_query[:50]}...")
-        patterns = pattern_search(
-            query=search_query,
-            top_k=5,  # Get a few more to filter
-            min_confidence=CONFIDENCE_MEDIUM,  # Only medium+ confidence
-        )
+        patterns = find_patterns(search_query)
 
         if not patterns:
             logger.debug("No patterns found")
             return {}
 
-        # Format lessons
-        lessons = []
-        for pattern in patterns:
-            # Handle both direct pattern dicts and wrapped results
-            if isinstance(pattern, dict):
-                if "raw" in pattern:
-                    # Skip raw output format from pattern_search
-                    continue
-                lesson = format_lesson(pattern)
-                if lesson:
-                    lessons.append(lesson)
+        # Format lessons, limited to MAX_LESSONS. Only direct pattern dicts
+        # count; raw output format from pattern_search is skipped.
+        lessons = list(
+            itertools.islice(
+                (
+                    lesson
+                    for pattern in patterns
+                    if isinstance(pattern, dict) and "raw" not in pattern and (lesson := format_lesson(pattern))
+                ),
+                MAX_LESSONS,
+            )
+        )
 
         if not lessons:
             logger.debug("No lessons after filtering")
             return {}
 
-        # Limit to MAX_LESSONS
-        lessons = lessons[:MAX_LESSONS]
-
         # Build output
         context_lines = ["[Lessons from past sessions]"] + lessons
         additional_context = "\n".join(context_lines)
@@ -162,16 +249,27 @@ def process_hook(hook_input: dict) -> dict:
 
 
 def main():
-    """Main entry point - reads stdin, writes stdout."""
+    """Main entry point - reads stdin, writes stdout.
+
+    `lesson_injector.py --refresh QUERY` is the detached background search
+    started for a stale cache entry.
+    """
+    if len(sys.argv) == 3 and sys.argv[1] == "--refresh":
+        _search(sys.argv[2], timeout=10)
+        sys.exit(0)
+
     try:
-        input_data = json.load(sys.stdin)
-    except json.JSONDecodeError as e:
+        input_data = fastjson.load_stdin()
+    except fastjson.JSONDecodeError as e:
         logger.error(f"Invalid JSON input: {e}")
-        print(json.dumps({}))
+        fastjson.write_stdout(_EMPTY)
         sys.exit(0)
 
     result = process_hook(input_data)
-    print(json.dumps(result))
+    if result:
+        fastjson.emit(result)
+    else:
+        fastjson.write_stdout(_EMPTY)
     sys.exit(0)
 
 
@@ -6,14 +6,14 @@ Analyzes session activity and extracts learning patterns:
 - High error rate: >25% error rate indicates problems
 - Quality drop: declining quality trend over session
 
-Patterns are stored via mcp_client.pattern_store() for SONA learning.
+Patterns are stored via mcp_client.pattern_store() (pattern_store_batch() when
+several are found) for SONA learning.
 """
 
 from __future__ import annotations
 
 import contextlib
-import json
-import logging
+import functools
 import os
 import sys
 from pathlib import Path
@@ -21,12 +21,16 @@ from typing import Any
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core import fastjson
+from core.hook_logging import get_file_logger
+
 try:
     from core.mcp_client import (
         get_project_name,
         get_timestamp,
         memory_retrieve,
         pattern_store,
+        pattern_store_batch,
     )
 except ImportError:
     from datetime import datetime, timezone
@@ -42,8 +46,7 @@ except ImportError:
     def _load_store() -> dict:
         MCP_STORE.parent.mkdir(parents=True, exist_ok=True)
         if MCP_STORE.exists():
-            with open(MCP_STORE) as f:
-                return json.load(f)
+            return fastjson.loads(MCP_STORE.read_bytes())
         return {"entries": {}}
 
     def memory_retrieve(key: str, namespace: str = "") -> Any:
@@ -60,17 +63,16 @@ except ImportError:
         """Fallback stub - args prefixed with _ to suppress unused warnings."""
         return {"success": True, "fallback": True}
 
+    def pattern_store_batch(items: list[tuple[str, str, float, dict | None]]) -> list[dict]:
+        """Fallback stub - one result per item, nothing stored."""
+        return [{"success": True, "fallback": True} for _ in items]
+
 
 LOG_DIR = Path(os.environ.get("METRICS_DIR", "/tmp/claude-metrics"))
-LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "meta_learning.log"
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
-logger = logging.getLogger(__name__)
+# Log dir/file are created on the first record, not at import
+logger = get_file_logger(__name__, LOG_FILE)
 
 SESSION_ANALYSIS_FILE = LOG_DIR / "session_analysis.json"
 
@@ -78,8 +80,13 @@ THRESHOLD_REWORK_EDITS = 3
 THRESHOLD_ERROR_RATE = 0.25
 THRESHOLD_QUALITY_DROP = 0.15
 MIN_QUALITY_SAMPLES = 3
+QUALITY_WINDOW = 10  # Most recent trajectories used for the quality trend
+
+# The loaders below are memoized for the hook run: inputs do not change while
+# the hook executes. Returned objects are shared - callers must not mutate them.
 
 
+@functools.lru_cache(maxsize=1)
 def load_trajectory_data(project: str) -> list[dict[str, Any]]:
     """Load trajectory index from memory."""
     try:
@@ -90,25 +97,25 @@ def load_trajectory_data(project: str) -> list[dict[str, Any]]:
         return []
 
 
+@functools.lru_cache(maxsize=1)
 def load_session_analysis() -> dict[str, Any]:
     """Load session analyzer output from file."""
     try:
         if SESSION_ANALYSIS_FILE.exists():
-            with open(SESSION_ANALYSIS_FILE) as f:
-                return json.load(f)
-    except (json.JSONDecodeError, OSError) as e:
+            return fastjson.loads(SESSION_ANALYSIS_FILE.read_bytes())
+    except (fastjson.JSONDecodeError, OSError) as e:
         logger.warning(f"Failed to load session analysis: {e}")
     return {}
 
 
+@functools.lru_cache(maxsize=1)
 def load_file_edit_counts() -> dict[str, int]:
     """Load file edit counts from session metrics."""
     metrics_file = LOG_DIR / "file_edit_counts.json"
     try:
         if metrics_file.exists():
-            with open(metrics_file) as f:
-                return json.load(f)
-    except (json.JSONDecodeError, OSError):
+            return fastjson.loads(metrics_file.read_bytes())
+    except (fastjson.JSONDecodeError, OSError):
         pass
     return {}
 
@@ -120,7 +127,7 @@ def load_quality_scores() -> list[float]:
         return []
 
     scores = []
-    for traj in trajectory_index[-10:]:
+    for traj in trajectory_index[-QUALITY_WINDOW:]:
         if "success_rate" in traj:
             scores.append(traj["success_rate"])
         elif "success" in traj:
@@ -154,12 +161,18 @@ def extract_rework_pattern(file_edit_counts: dict[str, int]) -> dict[str, Any] |
     if not file_edit_counts:
         return None
 
-    high_rework_files = [path for path, count in file_edit_counts.items() if count > THRESHOLD_REWORK_EDITS]
+    # Filter and running max in one pass
+    high_rework_files = []
+    max_edits = 0
+    for path, count in file_edit_counts.items():
+        if count > THRESHOLD_REWORK_EDITS:
+            high_rework_files.append(path)
+            if count > max_edits:
+                max_edits = count
 
     if not high_rework_files:
         return None
 
-    max_edits = max(file_edit_counts[f] for f in high_rework_files)
     return {
         "type": "high_rework",
         "files": high_rework_files,
@@ -196,22 +209,33 @@ def extract_error_pattern(session_analysis: dict[str, Any]) -> dict[str, Any] |
     }
 
 
+def _linear_slope(values: list[float]) -> float | None:
+    """Least-squares slope of values against x = 0..n-1 (None if undefined).
+
+    Closed form slope = (n*Sxy - Sx*Sy) / (n*Sxx - Sx^2); Sx and Sxx are
+    known analytically for x = 0..n-1, so only Sy and Sxy need one pass.
+    """
+    n = len(values)
+    sx = n * (n - 1) / 2
+    sxx = (n - 1) * n * (2 * n - 1) / 6
+    denominator = n * sxx - sx * sx
+    if denominator == 0:
+        return None
+
+    sy = sum(values)
+    sxy = sum(i * y for i, y in enumerate(values))
+    return (n * sxy - sx * sy) / denominator
+
+
 def extract_quality_drop_pattern(quality_scores: list[float]) -> dict[str, Any] | None:
     """Extract quality drop pattern from quality score trend."""
     if len(quality_scores) < MIN_QUALITY_SAMPLES:
         return None
 
-    n = len(quality_scores)
-    x_mean = (n - 1) / 2
-    y_mean = sum(quality_scores) / n
-
-    numerator = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(quality_scores))
-    denominator = sum((i - x_mean) ** 2 for i in range(n))
-
-    if denominator == 0:
+    slope = _linear_slope(quality_scores)
+    if slope is None:
         return None
 
-    slope = numerator / denominator
     start_quality = quality_scores[0]
     end_quality = quality_scores[-1]
     total_change = start_quality - end_quality
@@ -239,19 +263,26 @@ def extract_patterns(
     quality_scores: list[float],
 ) -> list[dict[str, Any]]:
     """Extract all patterns from session data."""
-    extractors = [
-        (extract_rework_pattern, file_edit_counts),
-        (extract_error_pattern, session_analysis),
-        (extract_quality_drop_pattern, quality_scores),
-    ]
-    return [p for func, data in extractors if (p := func(data)) is not None]
+    patterns = []
+    if (p := extract_rework_pattern(file_edit_counts)) is not None:
+        patterns.append(p)
+    if (p := extract_error_pattern(session_analysis)) is not None:
+        patterns.append(p)
+    if (p := extract_quality_drop_pattern(quality_scores)) is not None:
+        patterns.append(p)
+    return patterns
 
 
 def store_patterns(patterns: list[dict[str, Any]]) -> None:
-    """Store extracted patterns via mcp_client."""
+    """Store extracted patterns via mcp_client.
+
+    Several patterns go out in one pattern_store_batch() call; a single
+    pattern, and each item the batch failed to store, uses pattern_store().
+    """
     project = get_project_name()
     timestamp = get_timestamp()
 
+    items = []
     for pattern in patterns:
         pattern_type = pattern.get("type", "unknown")
         confidence = pattern.get("confidence", 0.5)
@@ -260,12 +291,33 @@ def store_patterns(patterns: list[dict[str, Any]]) -> None:
             "timestamp": timestamp,
             **{k: v for k, v in pattern.items() if k not in ("type", "confidence")},
         }
+        items.append((pattern_type, pattern_type, confidence, metadata))
 
+    if len(items) > 1:
         try:
-            pattern_store(pattern_type, pattern_type, confidence, metadata)
-            logger.info(f"Stored pattern: {pattern_type} (confidence={confidence:.2f})")
+            results = pattern_store_batch(items)
+        except Exception as e:
+            results = [{"success": False, "output": str(e)}] * len(items)
+        failed = []
+        for item, result in zip(items, results, strict=True):
+            if result.get("success"):
+                logger.info(f"Stored pattern: {item[1]} (confidence={item[2]:.2f})")
+            else:
+                failed.append(item)
+        if failed:
+            logger.warning(f"{len(failed)} of {len(items)} batched pattern stores failed, storing them one by one")
+        items = failed
+
+    for pattern_type, _, confidence, metadata in items:
+        try:
+            result = pattern_store(pattern_type, pattern_type, confidence, metadata)
         except Exception as e:
             logger.error(f"Failed to store pattern {pattern_type}: {e}")
+            continue
+        if result.get("success"):
+            logger.info(f"Stored pattern: {pattern_type} (confidence={confidence:.2f})")
+        else:
+            logger.error(f"Failed to store pattern {pattern_type}: {result.get('output', '')}")
 
 
 def main() -> int:
@@ -273,8 +325,8 @@ def main() -> int:
     try:
         # Read stdin (required by hook protocol, but not used by this hook)
         if not sys.stdin.isatty():
-            with contextlib.suppress(json.JSONDecodeError):
-                json.load(sys.stdin)  # Consume stdin
+            with contextlib.suppress(fastjson.JSONDecodeError):
+                fastjson.load_stdin()  # Consume stdin
 
         project = get_project_name()
         trajectory_index = load_trajectory_data(project)
@@ -298,12 +350,12 @@ def main() -> int:
         if patterns:
             store_patterns(patterns)
 
-        print(json.dumps({}))
+        fastjson.emit({})
         return 0
 
     except Exception as e:
         logger.error(f"Error in meta_learning hook: {e}")
-        print(json.dumps({}))
+        fastjson.emit({})
         return 0
 
 
@@ -15,15 +15,24 @@ FAANG Standards:
 
 from __future__ import annotations
 
-import json
-import logging
+import re
 import subprocess
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+try:
+    from core import fastjson, state_codec
+    from core.hook_logging import get_file_logger
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson, state_codec
+    from core.hook_logging import get_file_logger
+
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from typing import Any
 
 # =============================================================================
@@ -32,18 +41,14 @@ if TYPE_CHECKING:
 
 METRICS_DIR = Path.home() / ".claude" / "metrics"
 SESSION_STATE_FILE = METRICS_DIR / "session_state.json"
-LAST_SESSION_STATS_FILE = METRICS_DIR / "last_session_stats.json"  # For next session
+LAST_SESSION_STATS_FILE = METRICS_DIR / "last_session_stats.json"  # For next session (via state_codec)
 LOG_FILE = Path.home() / ".claude" / "logs" / "session-analyzer.log"
 
-# Ensure log directory exists
-LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+# Empty hook response, serialized once
+_EMPTY = b"{}"
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='{"ts":"%(asctime)s","level":"%(levelname)s","msg":"%(message)s"}',
-    handlers=[logging.FileHandler(LOG_FILE)],
-)
-logger = logging.getLogger(__name__)
+# Log dir/file are created on the first record, not at import
+logger = get_file_logger(__name__, LOG_FILE, fmt='{"ts":"%(asctime)s","level":"%(levelname)s","msg":"%(message)s"}')
 
 # File patterns for categorization
 CODE_EXTENSIONS: frozenset[str] = frozenset(
@@ -51,6 +56,8 @@ CODE_EXTENSIONS: frozenset[str] = frozenset(
 )
 CONFIG_EXTENSIONS: frozenset[str] = frozenset({".json", ".yaml", ".yml", ".toml", ".ini", ".env"})
 TEST_PATTERNS: tuple[str, ...] = ("test_", "_test.", "tests/", "spec.", ".spec.")
+# One C-level scan per path; IGNORECASE avoids lowercasing the full path
+_TEST_RE = re.compile("|".join(map(re.escape, TEST_PATTERNS)), re.IGNORECASE)
 
 # =============================================================================
 # Suggestion Thresholds (based on distribution analysis)
@@ -135,71 +142,77 @@ def run_git_command(args: list[str], timeout: float = 5.0) -> str | None:
 
 def categorize_file(filepath: str) -> str:
     """Categorize a file as code, test, config, or other."""
-    filepath_lower = filepath.lower()
-    filename = Path(filepath).name.lower()
-
     # Check for test files first (can be .py but should be categorized as test)
-    if any(pattern in filepath_lower for pattern in TEST_PATTERNS):
+    if _TEST_RE.search(filepath) is not None:
         return "test"
 
+    # Plain string ops instead of Path(): runs once per changed file.
+    # Only the short suffix is lowercased, not the whole path.
+    filename = filepath[filepath.rfind("/") + 1 :]
+    dot = filename.rfind(".")
+    ext = filename[dot:].lower() if dot > 0 else ""
+
     # Check extension (handles .env which has no suffix)
-    ext = Path(filepath).suffix.lower()
     if ext in CODE_EXTENSIONS:
         return "code"
-    if ext in CONFIG_EXTENSIONS or filename in {".env", ".envrc"}:
+    if ext in CONFIG_EXTENSIONS or (not ext and filename.lower() in {".env", ".envrc"}):
         return "config"
     return "other"
 
 
+def _iter_numstat_z(output: str) -> Iterator[tuple[str, int, int]]:
+    """Yield (path, lines_added, lines_deleted) from `git diff --numstat -z` output.
+
+    Records are "added\tdeleted\tpath\0", or "added\tdeleted\t\0old\0new\0"
+    for renames (the new path is kept). Binary files report "-" counts (0).
+    """
+    tokens = iter(output.split("\0"))
+    for token in tokens:
+        parts = token.split("\t", 2)
+        if len(parts) < 3:
+            continue
+        path = parts[2]
+        if not path:  # Rename: old and new paths follow as separate tokens
+            next(tokens, None)
+            path = next(tokens, "")
+        if path:
+            added = int(parts[0]) if parts[0].isdigit() else 0
+            deleted = int(parts[1]) if parts[1].isdigit() else 0
+            yield path, added, deleted
+
+
 def get_uncommitted_changes() -> GitChanges:
     """Analyze uncommitted changes (staged + unstaged)."""
     changes = GitChanges()
 
-    # Get changed file names
-    diff_files = run_git_command(["diff", "--name-only", "HEAD"])
-    staged_files = run_git_command(["diff", "--name-only", "--cached"])
-
-    if diff_files is None and staged_files is None:
-        return changes
-
-    all_files: set[str] = set()
-    if diff_files:
-        all_files.update(diff_files.split("\n"))
-    if staged_files:
-        all_files.update(staged_files.split("\n"))
-    all_files.discard("")
+    # Files and line counts in one pass: worktree vs HEAD covers staged and
+    # unstaged edits; --cached adds staged files reverted in the worktree
+    numstat = run_git_command(["diff", "--numstat", "-z", "HEAD"])
+    staged_numstat = run_git_command(["diff", "--numstat", "-z", "--cached"])
 
-    if not all_files:
+    if numstat is None and staged_numstat is None:
         return changes
 
-    changes.has_changes = True
-
-    # Categorize files
-    for f in all_files:
-        category = categorize_file(f)
-        if category == "code":
-            changes.code_files.append(f)
-        elif category == "test":
-            changes.test_files.append(f)
-        elif category == "config":
-            changes.config_files.append(f)
-        else:
-            changes.other_files.append(f)
-
-    # Get line counts
-    numstat = run_git_command(["diff", "--numstat", "HEAD"])
-    if numstat:
-        for line in numstat.split("\n"):
-            if not line or "\t" not in line:
-                continue
-            parts = line.split("\t")
-            if len(parts) >= 2:
-                if parts[0].isdigit():
-                    changes.lines_added += int(parts[0])
-                if parts[1].isdigit():
-                    changes.lines_deleted += int(parts[1])
-
-    logger.info(f"Analyzed changes: +{changes.lines_added}/-{changes.lines_deleted}, {len(all_files)} files")
+    # Categorize while parsing: each new path goes straight to its list
+    by_category = {
+        "code": changes.code_files,
+        "test": changes.test_files,
+        "config": changes.config_files,
+        "other": changes.other_files,
+    }
+    seen: set[str] = set()
+    for output, count_lines in ((numstat, True), (staged_numstat, False)):
+        for path, added, deleted in _iter_numstat_z(output or ""):
+            if count_lines:
+                changes.lines_added += added
+                changes.lines_deleted += deleted
+            if path not in seen:
+                seen.add(path)
+                by_category[categorize_file(path)].append(path)
+
+    if seen:
+        changes.has_changes = True
+        logger.info(f"Analyzed changes: +{changes.lines_added}/-{changes.lines_deleted}, {len(seen)} files")
     return changes
 
 
@@ -209,7 +222,7 @@ def get_session_commits() -> list[dict[str, str]]:
         return []
 
     try:
-        state = json.loads(SESSION_STATE_FILE.read_text())
+        state = fastjson.loads(SESSION_STATE_FILE.read_bytes())
         start_commit = state.get("start_commit")
         if not start_commit:
             return []
@@ -231,7 +244,7 @@ def get_session_commits() -> list[dict[str, str]]:
                 )
         return commits
 
-    except (json.JSONDecodeError, OSError) as e:
+    except (fastjson.JSONDecodeError, OSError) as e:
         logger.warning(f"Failed to get session commits: {e}")
         return []
 
@@ -378,10 +391,12 @@ def save_stats_for_next_session(
     suggestions: list[Suggestion],
 ) -> None:
     """Save session stats and suggestions for injection into next session."""
+    import time
     from datetime import datetime
 
     stats = {
         "timestamp": datetime.now().isoformat(),
+        "epoch": time.time(),  # Freshness checks compare this; timestamp is for humans
         "git": {
             "has_changes": changes.has_changes,
             "lines_added": changes.lines_added,
@@ -402,8 +417,9 @@ def save_stats_for_next_session(
 
     try:
         METRICS_DIR.mkdir(parents=True, exist_ok=True)
-        LAST_SESSION_STATS_FILE.write_text(json.dumps(stats, indent=2))
-        logger.info(f"Saved stats for next session: {stats['formatted']}")
+        # Compact binary encoding, replaced atomically (see state_codec)
+        state_codec.dump(LAST_SESSION_STATS_FILE, stats)
+        logger.debug(f"Saved stats for next session: {stats['formatted']}")
     except OSError as e:
         logger.warning(f"Failed to save stats: {e}")
 
@@ -416,9 +432,9 @@ def save_stats_for_next_session(
 def main() -> None:
     """Main hook entry point."""
     try:
-        input_data: dict[str, Any] = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        print(json.dumps({}))
+        input_data: dict[str, Any] = fastjson.load_stdin()
+    except fastjson.JSONDecodeError:
+        fastjson.write_stdout(_EMPTY)
         sys.exit(0)
 
     # Analyze
@@ -434,20 +450,18 @@ def main() -> None:
 
     # Skip output if nothing interesting (but stats are saved)
     if not changes.has_changes and metrics.tool_calls < THRESHOLD_MIN_TOOL_CALLS:
-        logger.info("No significant activity, skipping output")
-        print(json.dumps({}))
+        logger.debug("No significant activity, skipping output")  # Debug: no log file open on the no-op path
+        fastjson.write_stdout(_EMPTY)
         sys.exit(0)
 
     # Format stats with suggestions (shown at stop, also saved for next session start)
     formatted = format_session_stats(changes, metrics, commits, suggestions)
 
     if formatted:
-        output = {"systemMessage": formatted}
         logger.info(f"Output: {formatted}")
+        fastjson.emit({"systemMessage": formatted})
     else:
-        output = {}
-
-    print(json.dumps(output))
+        fastjson.write_stdout(_EMPTY)
     sys.exit(0)
 
 
@@ -8,215 +8,307 @@ Works with session-analyzer.py to enable intelligent diff-based suggestions.
 Runs on FIRST prompt of session only (detects new session).
 """
 
-import json
+import contextlib
+import os
 import subprocess
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from core import fastjson, state_codec
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson, state_codec
+
 METRICS_DIR = Path.home() / ".claude" / "metrics"
-SESSION_STATE_FILE = METRICS_DIR / "session_state.json"
-LAST_SESSION_STATS_FILE = METRICS_DIR / "last_session_stats.json"
+SESSION_STATE_FILE = METRICS_DIR / "session_state.json"  # Anchor: rewritten on new sessions only
+SESSION_EVENTS_FILE = METRICS_DIR / "session_events.jsonl"  # Per-prompt activity, appended
+LAST_SESSION_STATS_FILE = METRICS_DIR / "last_session_stats.json"  # Via state_codec
 INSIGHTS_FILE = METRICS_DIR / "session_insights.json"  # SSOT
 SESSION_TIMEOUT_MINUTES = 30  # New session if > 30 min since last activity
 MAX_STATS_AGE_HOURS = 24  # Ignore stats older than this
 
+# Empty hook response, serialized once
+_EMPTY = b"{}"
+
+# Event records are ~35 bytes, so the last one always fits in this tail
+_EVENTS_TAIL_BYTES = 256
+
+# A continuing prompt within this many seconds of the last recorded event is
+# not written (prompt_count may undercount bursts; the timeout is unaffected)
+_DEBOUNCE_SECONDS = 2.0
+
+
+# (commit, branch, root) from one git call, cached for the life of the hook process
+_git_state: tuple[str | None, str | None, str | None] | None = None
+
+
+def get_git_state() -> tuple[str | None, str | None, str | None]:
+    """Get HEAD commit, branch name and repo root with a single git process."""
+    global _git_state
+    if _git_state is None:
+        _git_state = (None, None, None)
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "HEAD", "--abbrev-ref", "HEAD", "--show-toplevel"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+            lines = result.stdout.splitlines()
+            if result.returncode == 0 and len(lines) == 3:
+                _git_state = (lines[0].strip(), lines[1].strip(), lines[2].strip())
+            else:
+                # No HEAD yet (fresh repo): rev-parse fails as a whole, but the root still resolves
+                result = subprocess.run(
+                    ["git", "rev-parse", "--show-toplevel"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5,
+                )
+                if result.returncode == 0 and result.stdout.strip():
+                    _git_state = (None, None, result.stdout.strip())
+        except Exception:
+            pass
+    return _git_state
+
 
 def get_current_commit() -> str | None:
     """Get current HEAD commit."""
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
-    return None
+    return get_git_state()[0]
 
 
 def get_current_branch() -> str | None:
     """Get current branch name."""
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
-    return None
+    return get_git_state()[1]
 
 
 def get_repo_root() -> str | None:
     """Get git repository root."""
+    return get_git_state()[2]
+
+
+def _age_seconds(data: dict, epoch_key: str, iso_key: str) -> float | None:
+    """Seconds since the time recorded in data, or None if it has none.
+
+    Uses the epoch float when present; files written before it was added
+    only carry the ISO timestamp, which is parsed as a fallback.
+    """
+    epoch: float | None = data.get(epoch_key)
+    if epoch is not None:
+        return time.time() - epoch
+    iso = data.get(iso_key)
+    if not iso:
+        return None
+    return (datetime.now() - datetime.fromisoformat(iso)).total_seconds()
+
+
+def _mtime_age(path: Path) -> float | None:
+    """Seconds since path was last written (one stat, no read); None if missing."""
     try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except Exception:
-        pass
-    return None
+        return time.time() - os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
 
 
-def is_new_session() -> bool:
-    """Determine if this is a new session (vs continuation)."""
-    if not SESSION_STATE_FILE.exists():
-        return True
+def _last_event() -> dict | None:
+    """Return the newest {"t": epoch, "n": prompt_count} event, reading only the file tail."""
+    try:
+        with open(SESSION_EVENTS_FILE, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - _EVENTS_TAIL_BYTES))
+            tail = f.read()
+    except FileNotFoundError:
+        return None
 
+    last_line = tail.rstrip(b"\n").rsplit(b"\n", 1)[-1]
+    if not last_line:
+        return None
     try:
-        state = json.loads(SESSION_STATE_FILE.read_text())
-        last_activity = state.get("last_activity")
+        event: dict = fastjson.loads(last_line)
+    except fastjson.JSONDecodeError:
+        return None
+    return event
 
-        if not last_activity:
-            return True
 
-        last_dt = datetime.fromisoformat(last_activity)
-        elapsed = (datetime.now() - last_dt).total_seconds() / 60
+def _append_event(epoch: float, prompt_count: int) -> None:
+    """Append one activity event with a single O_APPEND write."""
+    line = fastjson.dumps({"t": epoch, "n": prompt_count}) + b"\n"
+    fd = os.open(SESSION_EVENTS_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def classify_session() -> tuple[bool, dict | None]:
+    """Read session state once and decide if this is a new session.
+
+    The anchor file is merged with the newest appended event, so the returned
+    state carries the current last_activity_epoch and prompt_count.
+
+    Returns (is_new, state); state is None when missing or unreadable and is
+    meant to be passed on to save_session_state() instead of re-reading.
+    """
+    try:
+        anchor_mtime = os.stat(SESSION_STATE_FILE).st_mtime
+        state = fastjson.loads(SESSION_STATE_FILE.read_bytes())
+    except (fastjson.JSONDecodeError, OSError):
+        return True, None
+
+    try:
+        if event := _last_event():
+            state["last_activity_epoch"] = event["t"]
+            state["prompt_count"] = event["n"]
+
+        elapsed = _age_seconds(state, "last_activity_epoch", "last_activity")
+
+        if elapsed is None:
+            return True, state
+
+        # dora-tracker rewrites the anchor on tool activity, which also counts
+        elapsed = min(elapsed, time.time() - anchor_mtime)
 
         # New session if timeout exceeded
-        if elapsed > SESSION_TIMEOUT_MINUTES:
-            return True
+        if elapsed > SESSION_TIMEOUT_MINUTES * 60:
+            return True, state
+
+        # Same repo? A cwd inside the recorded root settles it without running git
+        repo_root = state.get("repo_root")
+        cwd = os.getcwd()
+        if repo_root and (cwd == repo_root or cwd.startswith(repo_root + os.sep)):
+            return False, state
 
-        # Same repo?
         current_repo = get_repo_root()
-        return bool(current_repo and state.get("repo_root") != current_repo)
+        return bool(current_repo and repo_root != current_repo), state
 
-    except (json.JSONDecodeError, ValueError, OSError):
-        return True
+    except (AttributeError, KeyError, TypeError, ValueError, OSError):
+        return True, None
 
 
-def save_session_state(is_new: bool):
-    """Save or update session state."""
+def is_new_session() -> bool:
+    """Determine if this is a new session (vs continuation)."""
+    return classify_session()[0]
+
+
+def save_session_state(is_new: bool, state: dict | None = None) -> dict:
+    """Save or update session state.
+
+    A new session writes the anchor file atomically (fastjson.dump_file) and
+    drops the previous session's events. A continuing session appends one
+    event, unless the last one is under _DEBOUNCE_SECONDS old; `state` (the
+    dict read by classify_session()) is updated in place and returned.
+    """
+    now_epoch = time.time()
+
+    if not is_new and state is not None:
+        # Existing session - just record activity (epoch only: the anchor's
+        # ISO last_activity is for display and is not rewritten here)
+        last_epoch = state.get("last_activity_epoch")
+        state["last_activity_epoch"] = now_epoch
+        state["prompt_count"] = state.get("prompt_count", 0) + 1
+        # Prompts in quick succession add nothing to the timeout check; skip the write
+        if last_epoch is None or now_epoch - last_epoch >= _DEBOUNCE_SECONDS:
+            _append_event(now_epoch, state["prompt_count"])
+        return state
+
+    # New session (or missing/corrupted state) - record starting state
     METRICS_DIR.mkdir(parents=True, exist_ok=True)
-
-    now = datetime.now().isoformat()
-
-    if is_new:
-        # New session - record starting state
-        state = {
-            "session_start": now,
-            "start_commit": get_current_commit(),
-            "start_branch": get_current_branch(),
-            "repo_root": get_repo_root(),
-            "last_activity": now,
-            "prompt_count": 1,
-        }
-    else:
-        # Existing session - just update activity
-        try:
-            state = json.loads(SESSION_STATE_FILE.read_text())
-            state["last_activity"] = now
-            state["prompt_count"] = state.get("prompt_count", 0) + 1
-        except (json.JSONDecodeError, OSError):
-            # Corrupted state, start fresh
-            state = {
-                "session_start": now,
-                "start_commit": get_current_commit(),
-                "start_branch": get_current_branch(),
-                "repo_root": get_repo_root(),
-                "last_activity": now,
-                "prompt_count": 1,
-            }
-
-    SESSION_STATE_FILE.write_text(json.dumps(state, indent=2))
+    now = datetime.fromtimestamp(now_epoch).isoformat()
+    commit, branch, root = get_git_state()
+    state = {
+        "session_start": now,
+        "start_commit": commit,
+        "start_branch": branch,
+        "repo_root": root,
+        "last_activity": now,
+        "last_activity_epoch": now_epoch,
+        "prompt_count": 1,
+    }
+
+    fastjson.dump_file(SESSION_STATE_FILE, state)
+    SESSION_EVENTS_FILE.unlink(missing_ok=True)
     return state
 
 
 def get_previous_session_stats() -> dict | None:
     """Load stats from previous session if recent enough."""
-    if not LAST_SESSION_STATS_FILE.exists():
+    # A file last written before the cutoff cannot hold fresh stats - skip the read
+    mtime_age = _mtime_age(state_codec.state_path(LAST_SESSION_STATS_FILE))
+    if mtime_age is not None and mtime_age > MAX_STATS_AGE_HOURS * 3600:
         return None
 
     try:
-        stats = json.loads(LAST_SESSION_STATS_FILE.read_text())
-        timestamp = stats.get("timestamp")
-
-        if not timestamp:
+        stats: dict | None = state_codec.load(LAST_SESSION_STATS_FILE)
+        if not stats:
             return None
 
-        # Check age
-        stats_dt = datetime.fromisoformat(timestamp)
-        age_hours = (datetime.now() - stats_dt).total_seconds() / 3600
+        age = _age_seconds(stats, "epoch", "timestamp")
 
-        if age_hours > MAX_STATS_AGE_HOURS:
+        if age is None or age > MAX_STATS_AGE_HOURS * 3600:
             return None
 
         return stats
 
-    except (json.JSONDecodeError, ValueError, OSError):
+    except (fastjson.JSONDecodeError, TypeError, ValueError, OSError):
         return None
 
 
 def clear_previous_session_stats() -> None:
     """Clear stats after injecting (prevent repeated injection)."""
-    try:
-        if LAST_SESSION_STATS_FILE.exists():
-            LAST_SESSION_STATS_FILE.unlink()
-    except OSError:
-        pass
+    with contextlib.suppress(OSError):
+        state_codec.unlink(LAST_SESSION_STATS_FILE)
 
 
 def get_previous_insights() -> str | None:
     """Load SSOT insights from previous session and format compactly."""
-    if not INSIGHTS_FILE.exists():
+    # One stat answers both "missing" and "stale" without reading the file
+    mtime_age = _mtime_age(INSIGHTS_FILE)
+    if mtime_age is None or mtime_age > MAX_STATS_AGE_HOURS * 3600:
         return None
 
     try:
-        data = json.loads(INSIGHTS_FILE.read_text())
-        timestamp = data.get("ended_at")
-
+        data = fastjson.loads(INSIGHTS_FILE.read_bytes())
         # Check age
-        if timestamp:
-            ended_dt = datetime.fromisoformat(timestamp)
-            age_hours = (datetime.now() - ended_dt).total_seconds() / 3600
-            if age_hours > MAX_STATS_AGE_HOURS:
-                return None
+        age = _age_seconds(data, "ended_epoch", "ended_at")
+        if age is not None and age > MAX_STATS_AGE_HOURS * 3600:
+            return None
+
+        # Pull each section out once; the checks below work on locals
+        ctx = data.get("context") or {}
+        summary = data.get("summary") or {}
+        git = data.get("git") or {}
+        delegation = data.get("delegation") or {}
+        tips = data.get("tips") or ()
 
         # Format compact output
         parts = []
 
         # Context percentage
-        if ctx := data.get("context"):
-            pct = ctx.get("percentage", 0)
-            status = ctx.get("status", "normal")
-            if status == "critical":
-                parts.append(f"{pct}% ctx!")
-            elif status == "warning":
-                parts.append(f"{pct}% ctx")
+        status = ctx.get("status")
+        if status == "critical":
+            parts.append(f"{ctx.get('percentage', 0)}% ctx!")
+        elif status == "warning":
+            parts.append(f"{ctx.get('percentage', 0)}% ctx")
 
         # Summary stats
-        if summary := data.get("summary"):
-            calls = summary.get("tool_calls", 0)
-            errors = summary.get("errors", 0)
-            if calls:
-                parts.append(f"{calls} calls")
-            if errors:
-                parts.append(f"{errors} err")
+        if calls := summary.get("tool_calls"):
+            parts.append(f"{calls} calls")
+        if errors := summary.get("errors"):
+            parts.append(f"{errors} err")
 
         # Git status
-        if (git := data.get("git")) and git.get("uncommitted"):
-            added = git.get("lines_added", 0)
-            removed = git.get("lines_removed", 0)
-            parts.append(f"uncommitted +{added}/-{removed}")
+        if git.get("uncommitted"):
+            parts.append(f"uncommitted +{git.get('lines_added', 0)}/-{git.get('lines_removed', 0)}")
 
         # Delegation recommendation
-        if data.get("delegation", {}).get("recommended"):
+        if delegation.get("recommended"):
             parts.append("DELEGATE!")
 
         # High-confidence tips with category breakdown + top command
-        tips = data.get("tips", [])
         high_conf_tips = [t for t in tips if t.get("confidence", 0) >= 0.7]
         if high_conf_tips:
             # Compact format: category counts + top command suggestion
@@ -225,16 +317,18 @@ def get_previous_insights() -> str | None:
                 cat = t.get("category", "general")
                 categories[cat] = categories.get(cat, 0) + 1
 
-            cat_summary = "/".join(f"{c}:{n}" for c, n in sorted(categories.items()))
-            top_cmd = high_conf_tips[0].get("command", "")
+            if len(categories) == 1:
+                cat_summary = f"{cat}:{len(high_conf_tips)}"
+            else:
+                cat_summary = "/".join(f"{c}:{n}" for c, n in sorted(categories.items()))
 
             parts.append(f"{len(high_conf_tips)} tips ({cat_summary})")
-            if top_cmd:
+            if top_cmd := high_conf_tips[0].get("command"):
                 parts.append(f"try: {top_cmd}")
 
         return ", ".join(parts) if parts else None
 
-    except (json.JSONDecodeError, ValueError, OSError):
+    except (fastjson.JSONDecodeError, TypeError, ValueError, OSError):
         return None
 
 
@@ -247,18 +341,18 @@ def clear_previous_insights() -> None:
         pass
 
 
-def main():
+def main() -> None:
     try:
-        _input_data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        print(json.dumps({}))
+        _input_data = fastjson.load_stdin()
+    except fastjson.JSONDecodeError:
+        fastjson.write_stdout(_EMPTY)
         sys.exit(0)
 
-    # Check if new session
-    is_new = is_new_session()
+    # Check if new session (state file is read once and reused for the update)
+    is_new, state = classify_session()
 
     # Save state
-    state = save_session_state(is_new)
+    state = save_session_state(is_new, state)
 
     # Build output
     context_parts = []
@@ -284,9 +378,9 @@ def main():
         output = {
             "additionalContext": " ".join(context_parts),
         }
-        print(json.dumps(output))
+        fastjson.emit(output)
     else:
-        print(json.dumps({}))
+        fastjson.write_stdout(_EMPTY)
 
     sys.exit(0)
 
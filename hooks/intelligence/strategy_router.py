@@ -2,12 +2,29 @@
 """Strategy Router v2: State Machine + PMW Fixes."""
 
 import contextlib
-import json
+import functools
+import http.client
+import itertools
+import os
+import re
+import socket
+import sqlite3
 import subprocess
 import sys
+import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
+from typing import Any
+
+try:
+    from core import fastjson
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson
 
 
 class Phase(Enum):
@@ -20,50 +37,291 @@ class Phase(Enum):
 
 METRICS = Path.home() / ".claude" / "metrics"
 CACHE_FILE = METRICS / "gh_cache.json"
+EDITS_DB = METRICS / "edits.db"  # Written by dora-tracker
+FILE_EDITS_FILE = METRICS / "file_edits.json"  # Legacy, read until edits.db exists
 CACHE_TTL = 30  # seconds
+QUIET_CACHE_TTL = 300  # seconds, while nothing changed locally since the last run
 
+# GitHub queries; the gh command lines, prefixed with the repo root, double as
+# cache keys for either source
+PR_CMD = ["pr", "view", "--json", "number,state,reviewDecision"]
+CI_CMD = ["run", "list", "--limit", "1", "--json", "status,conclusion"]
 
-def cached_gh(cmd: list[str]) -> dict | None:
-    """Cached gh CLI call."""
-    cache_key = " ".join(cmd)
-    with contextlib.suppress(Exception):
-        if CACHE_FILE.exists():
-            cache = json.loads(CACHE_FILE.read_text())
-            if cache.get("key") == cache_key and time.time() - cache.get("ts", 0) < CACHE_TTL:
-                return cache.get("data")
+# With a token, PR and CI state come from the GitHub API over one HTTPS
+# connection instead of two gh processes (reviewDecision is GraphQL-only)
+GITHUB_API_HOST = "api.github.com"
+GITHUB_API_TIMEOUT = 10  # seconds
+PR_GRAPHQL_QUERY = """
+query($owner: String!, $name: String!, $branch: String!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(headRefName: $branch, first: 1, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes { number state reviewDecision }
+    }
+  }
+}
+"""
+
+# Optional in-memory cache daemon (services/gh_cache_daemon.py); used when running
+GH_CACHE_SOCKET = Path(os.environ.get("GH_CACHE_SOCKET", str(Path.home() / ".claude" / "cache.sock")))
+GH_CACHE_SOCKET_TIMEOUT = 12  # seconds: a daemon miss runs gh (10s timeout) itself
+_DAEMON_MAX_REPLY = 1 << 20
+
+# owner/repo from https://github.com/owner/repo(.git) and git@github.com:owner/repo(.git)
+_REMOTE_RE = re.compile(r"github\.com[:/]([a-zA-Z0-9_.-]+)/([a-zA-Z0-9_.-]+?)(?:\.git)?/?$")
+
+# Directives in priority order, as (pr_num, thrashing files) -> message; only
+# the one that applies is formatted. Conditions, in the same order:
+# CI failing with no PR, changes requested, error rate 25%+ over 10+ calls,
+# a file edited 5x+, review required.
+_DIRECTIVES: tuple[Callable[[int, list[str]], str], ...] = (
+    lambda pr_num, thrashing: "[TEST] CI failing → git stash && fix CI",
+    lambda pr_num, thrashing: f"[REVIEW] PR #{pr_num} blocked → address comments",
+    lambda pr_num, thrashing: "[DEBUG] Error rate 25%+ → /undo:checkpoint",
+    lambda pr_num, thrashing: f"[DEV] {thrashing[0]} edited 5x+ → step back",
+    lambda pr_num, thrashing: f"[REVIEW] PR #{pr_num} → awaiting review",
+)
+
+# Every combination of the conditions above -> highest-priority directive (or None)
+_DIRECTIVE_TABLE: dict[tuple[bool, ...], Callable[[int, list[str]], str] | None] = {
+    key: next((d for hit, d in zip(key, _DIRECTIVES, strict=True) if hit), None)
+    for key in itertools.product((False, True), repeat=len(_DIRECTIVES))
+}
+
+# gh results keyed by repo root + command, plus "_edits_mtime"; loaded once, saved once per run
+_gh_cache: dict | None = None
+_gh_cache_dirty = False
+_gh_cache_lock = threading.Lock()  # gh queries run on worker threads
+
+
+def _load_json(path: Path) -> dict:
+    """Parse a small metrics file; {} if missing or unreadable."""
+    try:
+        data = fastjson.loads(path.read_bytes())
+    except (fastjson.JSONDecodeError, OSError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _thrashing_files() -> tuple[list[str], float | None]:
+    """Names of files reworked 5+ times, and the mtime of the file they came from."""
+    try:
+        edits_mtime = os.stat(EDITS_DB).st_mtime
+    except OSError:
+        edits = _load_json(FILE_EDITS_FILE)
+        try:
+            edits_mtime = os.stat(FILE_EDITS_FILE).st_mtime
+        except OSError:
+            edits_mtime = None
+        return [Path(f).name for f, v in edits.items() if v.get("rework_count", 0) >= 5], edits_mtime
+
+    try:
+        with contextlib.closing(sqlite3.connect(f"file:{EDITS_DB}?mode=ro", uri=True, timeout=1.0)) as conn:
+            rows = conn.execute("SELECT path FROM edits WHERE rework_count >= 5").fetchall()
+    except sqlite3.Error:
+        rows = []
+    return [Path(path).name for (path,) in rows], edits_mtime
+
+
+def _get_gh_cache() -> dict:
+    """Load gh_cache.json on first use (dropping the old single-entry format)."""
+    global _gh_cache
+    if _gh_cache is None:
+        _gh_cache = _load_json(CACHE_FILE)
+        if "key" in _gh_cache:
+            _gh_cache = {}
+    return _gh_cache
+
+
+def _save_gh_cache() -> None:
+    """Write gh_cache.json if this run changed it."""
+    if _gh_cache_dirty:
+        METRICS.mkdir(parents=True, exist_ok=True)
+        fastjson.dump_file(CACHE_FILE, _gh_cache)
+
+
+@functools.lru_cache(maxsize=1)
+def _repo_root() -> str:
+    """Top directory of the git checkout containing cwd (cwd itself outside one)."""
+    cwd = Path.cwd()
+    for path in (cwd, *cwd.parents):
+        if (path / ".git").exists():
+            return str(path)
+    return str(cwd)
+
+
+def _cache_key(cmd: list[str]) -> str:
+    """gh cache key for cmd: gh answers for the current checkout, so its root is part of the key."""
+    return f"{_repo_root()} {' '.join(cmd)}"
+
+
+def _cache_lookup(cache_key: str, ttl: float) -> tuple[bool, Any]:
+    """Return (hit, data) for a gh cache entry younger than ttl."""
+    entry = _get_gh_cache().get(cache_key)
+    if isinstance(entry, dict) and time.time() - entry.get("ts", 0) < ttl:
+        return True, entry.get("data")
+    return False, None
+
+
+def _cache_store(cache_key: str, data: Any) -> None:
+    """Record a fresh result in the gh cache."""
+    global _gh_cache_dirty
+    with _gh_cache_lock:
+        _get_gh_cache()[cache_key] = {"ts": time.time(), "data": data}
+        _gh_cache_dirty = True
+
+
+def cached_gh(cmd: list[str], ttl: float = CACHE_TTL) -> Any:
+    """Cached gh CLI call: the parsed JSON (dict or list, per command), or None."""
+    cache_key = _cache_key(cmd)
+    hit, data = _cache_lookup(cache_key, ttl)
+    if hit:
+        return data
 
     try:
         r = subprocess.run(["gh", *cmd], capture_output=True, text=True, timeout=10)
         if r.returncode == 0:
-            data = json.loads(r.stdout) if r.stdout.strip() else None
-            CACHE_FILE.write_text(json.dumps({"key": cache_key, "ts": time.time(), "data": data}))
+            data = fastjson.loads(r.stdout) if r.stdout.strip() else None
+            _cache_store(cache_key, data)
             return data
     except Exception:
         pass
     return None
 
 
+def _repo_and_branch() -> tuple[str, str, str] | None:
+    """(owner, name, branch) of the current GitHub checkout, or None."""
+    try:
+        branch = subprocess.run(
+            ["git", "rev-parse", "--abbrev-ref", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+        url = subprocess.run(
+            ["git", "remote", "get-url", "origin"], capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return None
+
+    m = _REMOTE_RE.search(url)
+    if not m or not branch or branch == "HEAD":
+        return None
+    return m.group(1), m.group(2), branch
+
+
+def _github_api_state(token: str) -> tuple[dict | None, list] | None:
+    """Fetch (pr, runs) shaped like the gh --json output; None on any failure.
+
+    Both requests share one keep-alive HTTPS connection: a GraphQL POST for
+    the branch's PR and a REST GET for the latest workflow run.
+    """
+    target = _repo_and_branch()
+    if target is None:
+        return None
+    owner, name, branch = target
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
+        "User-Agent": "claude-hooks-strategy-router",
+    }
+    conn = http.client.HTTPSConnection(GITHUB_API_HOST, timeout=GITHUB_API_TIMEOUT)
+    try:
+        body = fastjson.dumps(
+            {"query": PR_GRAPHQL_QUERY, "variables": {"owner": owner, "name": name, "branch": branch}}
+        )
+        conn.request("POST", "/graphql", body=body, headers=headers)
+        resp = conn.getresponse()
+        payload = resp.read()
+        if resp.status != 200:
+            return None
+        nodes = fastjson.loads(payload)["data"]["repository"]["pullRequests"]["nodes"]
+        pr = nodes[0] if nodes else None
+
+        conn.request("GET", f"/repos/{owner}/{name}/actions/runs?per_page=1", headers=headers)
+        resp = conn.getresponse()
+        payload = resp.read()
+        if resp.status != 200:
+            return None
+        runs = [
+            {"status": run.get("status"), "conclusion": run.get("conclusion")}
+            for run in fastjson.loads(payload).get("workflow_runs", [])
+        ]
+        return pr, runs
+    except (OSError, http.client.HTTPException, fastjson.JSONDecodeError, KeyError, TypeError):
+        return None
+    finally:
+        conn.close()
+
+
+def _daemon_query(cmds: list[list[str]], ttl: float) -> list | None:
+    """Ask the gh cache daemon for several gh results; None if it is not running."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET) as sock:
+            sock.settimeout(GH_CACHE_SOCKET_TIMEOUT)
+            sock.connect(str(GH_CACHE_SOCKET))
+            sock.send(fastjson.dumps({"cmds": cmds, "ttl": ttl, "cwd": os.getcwd()}))
+            reply = fastjson.loads(sock.recv(_DAEMON_MAX_REPLY))
+    except (OSError, fastjson.JSONDecodeError):
+        return None
+    if not isinstance(reply, dict) or not reply.get("ok"):
+        return None
+    return reply.get("data")
+
+
+def get_github_state(ttl: float = CACHE_TTL) -> tuple[dict | None, list | None]:
+    """Return (pr, ci) for the current branch, cached for ttl seconds.
+
+    Asks the gh cache daemon first (no file I/O or process on a hit), then
+    the gh_cache.json file. On a miss uses the GitHub API when GITHUB_TOKEN
+    or GH_TOKEN is set, else gh.
+    """
+    if (data := _daemon_query([PR_CMD, CI_CMD], ttl)) is not None and len(data) == 2:
+        return data[0], data[1]
+
+    pr_key, ci_key = _cache_key(PR_CMD), _cache_key(CI_CMD)
+    pr_hit, pr = _cache_lookup(pr_key, ttl)
+    ci_hit, ci = _cache_lookup(ci_key, ttl)
+    if pr_hit and ci_hit:
+        return pr, ci
+
+    token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if token and (state := _github_api_state(token)) is not None:
+        pr, ci = state
+        _cache_store(pr_key, pr)
+        _cache_store(ci_key, ci)
+        return pr, ci
+
+    # Both gh calls wait on the network: run them concurrently so their
+    # latencies (and 10s timeouts) overlap instead of adding up
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        pr_future = executor.submit(cached_gh, PR_CMD, ttl)
+        ci_future = executor.submit(cached_gh, CI_CMD, ttl)
+        return pr_future.result(), ci_future.result()
+
+
 def get_phase_and_directive() -> tuple[Phase, str | None]:
     """Get current phase and directive."""
-    # Load metrics
-    state = {}
-    with contextlib.suppress(Exception):
-        state = json.loads((METRICS / "session_state.json").read_text())
+    global _gh_cache_dirty
 
-    edits = {}
-    with contextlib.suppress(Exception):
-        edits = json.loads((METRICS / "file_edits.json").read_text())
+    # Load metrics
+    state = _load_json(METRICS / "session_state.json")
 
     errors = state.get("errors", 0)
     calls = max(state.get("tool_calls", 1), 1)
     error_rate = errors / calls
 
-    # Thrashing detection (PMW fix: use existing file_edits.json)
-    thrashing = [Path(f).name for f, v in edits.items() if v.get("rework_count", 0) >= 5]
+    # Thrashing detection (PMW fix: use dora-tracker's rework counts)
+    thrashing, edits_mtime = _thrashing_files()
+
+    # GitHub state (cached). A quiet session - no errors, few calls, no edits
+    # since the last run - keeps its cached gh results longer.
+    cache = _get_gh_cache()
+    quiet = errors == 0 and calls <= 10 and edits_mtime == cache.get("_edits_mtime")
+    if cache.get("_edits_mtime") != edits_mtime:
+        cache["_edits_mtime"] = edits_mtime
+        _gh_cache_dirty = True
+    ttl = QUIET_CACHE_TTL if quiet else CACHE_TTL
 
-    # GitHub state (cached)
-    pr = cached_gh(["pr", "view", "--json", "number,state,reviewDecision"])
-    ci = cached_gh(["run", "list", "--limit", "1", "--json", "status,conclusion"])
+    pr, ci = get_github_state(ttl)
 
     pr_state = pr.get("state", "").lower() if pr else "none"
     pr_num = pr.get("number", 0) if pr else 0
@@ -83,34 +341,32 @@ def get_phase_and_directive() -> tuple[Phase, str | None]:
     elif pr_state == "merged":
         phase = Phase.MONITOR
 
-    # Directives (priority order)
-    if ci_status == "fail" and pr_state == "none":
-        return phase, "[TEST] CI failing → git stash && fix CI"
-    if review == "CHANGES_REQUESTED":
-        return phase, f"[REVIEW] PR #{pr_num} blocked → address comments"
-    if error_rate > 0.25 and calls > 10:
-        return phase, "[DEBUG] Error rate 25%+ → /undo:checkpoint"
-    if thrashing:
-        return phase, f"[DEV] {thrashing[0]} edited 5x+ → step back"
-    if review == "REVIEW_REQUIRED":
-        return phase, f"[REVIEW] PR #{pr_num} → awaiting review"
-
-    return phase, None
+    # Directive: one lookup on the conditions, in _DIRECTIVES priority order
+    conditions = (
+        ci_status == "fail" and pr_state == "none",
+        review == "CHANGES_REQUESTED",
+        error_rate > 0.25 and calls > 10,
+        bool(thrashing),
+        review == "REVIEW_REQUIRED",
+    )
+    make_directive = _DIRECTIVE_TABLE[conditions]
+    return phase, make_directive(pr_num, thrashing) if make_directive else None
 
 
 def main():
     with contextlib.suppress(Exception):
-        json.load(sys.stdin)
+        fastjson.load_stdin()
 
     phase, directive = get_phase_and_directive()
 
-    # Save phase state
+    # Save phase state and any new gh results
     with contextlib.suppress(Exception):
         METRICS.mkdir(parents=True, exist_ok=True)
-        (METRICS / "strategy_state.json").write_text(json.dumps({"phase": phase.value}))
+        fastjson.dump_file(METRICS / "strategy_state.json", {"phase": phase.value})
+        _save_gh_cache()
 
     if directive:
-        print(json.dumps({"systemMessage": directive}))
+        fastjson.emit({"systemMessage": directive})
     sys.exit(0)
 
 
@@ -12,53 +12,57 @@ Usage:
   trajectory_tracker.py --event=start   # PreToolUse
   trajectory_tracker.py --event=step    # PostToolUse
   trajectory_tracker.py --event=end     # Stop
+
+Set CLAUDE_HOOK_DEBUG=1 to log events to $METRICS_DIR/trajectory_tracker.log.
 """
 
-import argparse
+import atexit
 import contextlib
-import json
 import os
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
+from types import SimpleNamespace
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-try:
-    from core.mcp_client import (
-        get_project_name,
-        get_timestamp,
-        memory_retrieve,
-        memory_store,
-    )
-except ImportError:
-    # Fallback - direct file access
-    import json as _json
+from core import fastjson
+
+
+def get_timestamp() -> str:
+    """Get ISO timestamp (UTC), same format as core.mcp_client."""
+    return datetime.now(timezone.utc).isoformat()
+
 
-    MCP_STORE = Path.home() / ".claude-flow" / "memory" / "store.json"
+# Fallback - direct file access when core.mcp_client is unavailable
+MCP_STORE = Path.home() / ".claude-flow" / "memory" / "store.json"
 
-    def get_project_name():
-        return Path.cwd().name
 
-    def get_timestamp():
-        return datetime.now(timezone.utc).isoformat()
+def _load_store():
+    MCP_STORE.parent.mkdir(parents=True, exist_ok=True)
+    if MCP_STORE.exists():
+        return fastjson.loads(MCP_STORE.read_bytes())
+    return {"entries": {}}
 
-    def _load_store():
-        MCP_STORE.parent.mkdir(parents=True, exist_ok=True)
-        if MCP_STORE.exists():
-            with open(MCP_STORE) as f:
-                return _json.load(f)
-        return {"entries": {}}
 
-    def _save_store(store):
-        with open(MCP_STORE, "w") as f:
-            _json.dump(store, f, indent=2)
+def _save_store(store):
+    fastjson.dump_file(MCP_STORE, store)
 
-    def memory_store(key, value, namespace=""):
-        store = _load_store()
+
+def _fallback_memory_store_many(items, namespace="", now=None, delete=(), append=None, keep_last=0):
+    store = _load_store()
+    now = now or get_timestamp()
+    prefix = f"{namespace}:" if namespace else ""
+    for key in delete:
+        store["entries"].pop(f"{prefix}{key}", None)
+    items = dict(items)
+    for key, item in (append or {}).items():
+        current = store["entries"].get(f"{prefix}{key}", {}).get("value")
+        current = [*current, item] if isinstance(current, list) else [item]
+        items[key] = current[-keep_last:] if keep_last > 0 else current
+    for key, value in items.items():
         full_key = f"{namespace}:{key}" if namespace else key
-        now = get_timestamp()
         store["entries"][full_key] = {
             "key": full_key,
             "value": value,
@@ -67,15 +71,29 @@ except ImportError:
             "accessCount": 0,
             "lastAccessed": now,
         }
-        _save_store(store)
-        return {"success": True}
+    _save_store(store)
+    return {"success": True}
 
-    def memory_retrieve(key, namespace=""):
-        store = _load_store()
-        full_key = f"{namespace}:{key}" if namespace else key
-        if full_key in store.get("entries", {}):
-            return store["entries"][full_key].get("value")
-        return None
+
+def _fallback_memory_store(key, value, namespace="", now=None):
+    return _fallback_memory_store_many({key: value}, namespace, now)
+
+
+def _memory_api():
+    """Import the MCP memory functions on first use.
+
+    Only on_start and on_end store to memory; on_step (run on every Task
+    result) works on the active trajectory file and never imports them.
+    """
+    try:
+        from core import mcp_client
+    except ImportError:
+        return SimpleNamespace(
+            get_project_name=lambda: Path.cwd().name,
+            memory_store=_fallback_memory_store,
+            memory_store_many=_fallback_memory_store_many,
+        )
+    return mcp_client
 
 
 # Logging
@@ -86,31 +104,58 @@ LOG_FILE = LOG_DIR / "trajectory_tracker.log"
 # Active trajectory file (per-session state)
 TRAJECTORY_FILE = LOG_DIR / "active_trajectory.json"
 
+# Empty hook response, serialized once
+_EMPTY = b"{}"
 
-def log(msg: str):
-    """Log message to file."""
-    try:
-        with open(LOG_FILE, "a") as f:
-            f.write(f"{get_timestamp()} - {msg}\n")
-    except Exception:
-        pass
+INDEX_MAX_ENTRIES = 100  # Trajectory index keeps the most recent ones
+
+
+# Logging is off unless CLAUDE_HOOK_DEBUG=1
+_DEBUG = os.environ.get("CLAUDE_HOOK_DEBUG") == "1"
+_log_fd: int | None = None
+
+
+def _close_log():
+    """Close the log fd at interpreter exit."""
+    global _log_fd
+    if _log_fd is not None:
+        os.close(_log_fd)
+        _log_fd = None
+
+
+def _get_log_fd() -> int:
+    """Return the append-only log fd, opening it on first use."""
+    global _log_fd
+    if _log_fd is None:
+        _log_fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        atexit.register(_close_log)
+    return _log_fd
+
+
+def log(msg: str, now: str | None = None):
+    """Log message to file (`now`: the handler's timestamp, to avoid taking another).
+
+    No-op unless debugging; otherwise one O_APPEND write per message.
+    """
+    if not _DEBUG:
+        return
+    with contextlib.suppress(OSError):
+        os.write(_get_log_fd(), f"{now or get_timestamp()} - {msg}\n".encode())
 
 
 def load_active_trajectory() -> dict | None:
     """Load active trajectory from file."""
     if TRAJECTORY_FILE.exists():
         try:
-            with open(TRAJECTORY_FILE) as f:
-                return json.load(f)
+            return fastjson.loads(TRAJECTORY_FILE.read_bytes())
         except Exception:
             pass
     return None
 
 
 def save_active_trajectory(trajectory: dict):
-    """Save active trajectory to file."""
-    with open(TRAJECTORY_FILE, "w") as f:
-        json.dump(trajectory, f, indent=2)
+    """Save active trajectory to file (atomic replace)."""
+    fastjson.dump_file(TRAJECTORY_FILE, trajectory)
 
 
 def clear_active_trajectory():
@@ -131,8 +176,9 @@ def on_start(hook_input: dict):
     tool_input = hook_input.get("tool_input", {})
     task_description = tool_input.get("description", tool_input.get("prompt", "unknown"))[:200]
 
+    api = _memory_api()
     trajectory_id = generate_trajectory_id()
-    project = get_project_name()
+    project = api.get_project_name()
     now = get_timestamp()
 
     trajectory = {
@@ -148,9 +194,9 @@ def on_start(hook_input: dict):
     save_active_trajectory(trajectory)
 
     # Store in MCP memory for persistence
-    memory_store(f"trajectory:{project}:active", trajectory)
+    api.memory_store(f"trajectory:{project}:active", trajectory, now=now)
 
-    log(f"Started trajectory {trajectory_id}: {task_description[:50]}...")
+    log(f"Started trajectory {trajectory_id}: {task_description[:50]}...", now)
 
     # No output modification needed for PreToolUse
     return {}
@@ -158,9 +204,10 @@ def on_start(hook_input: dict):
 
 def on_step(hook_input: dict):
     """Handle PostToolUse Task - record step."""
+    now = get_timestamp()
     trajectory = load_active_trajectory()
     if not trajectory:
-        log("No active trajectory for step")
+        log("No active trajectory for step", now)
         return {}
 
     tool_result = hook_input.get("tool_result", {})
@@ -176,7 +223,7 @@ def on_step(hook_input: dict):
 
     step = {
         "action": tool_name,
-        "timestamp": get_timestamp(),
+        "timestamp": now,
         "success": success,
         "quality": 1.0 if success else 0.5,
     }
@@ -184,20 +231,21 @@ def on_step(hook_input: dict):
     trajectory["steps"].append(step)
     save_active_trajectory(trajectory)
 
-    log(f"Recorded step for {trajectory['id']}: {tool_name} (success={success})")
+    log(f"Recorded step for {trajectory['id']}: {tool_name} (success={success})", now)
 
     return {}
 
 
 def on_end(hook_input: dict):
     """Handle Stop - end trajectory and store for learning."""
+    now = get_timestamp()
     trajectory = load_active_trajectory()
     if not trajectory:
-        log("No active trajectory to end")
+        log("No active trajectory to end", now)
         return {}
 
-    project = get_project_name()
-    now = get_timestamp()
+    api = _memory_api()
+    project = api.get_project_name()
 
     # Calculate overall success
     steps = trajectory.get("steps", [])
@@ -215,67 +263,84 @@ def on_end(hook_input: dict):
     trajectory["success_rate"] = success_rate
     trajectory["total_steps"] = len(steps)
 
-    # Store completed trajectory
     trajectory_id = trajectory["id"]
-    memory_store(f"trajectory:{project}:{trajectory_id}", trajectory)
-
-    # Update trajectory index
-    index = memory_retrieve(f"trajectory:{project}:index") or []
-    index.append(
-        {
-            "id": trajectory_id,
-            "task": trajectory.get("task", "")[:100],
-            "success": overall_success,
-            "steps": len(steps),
-            "timestamp": now,
-        }
+
+    index_entry = {
+        "id": trajectory_id,
+        "task": trajectory.get("task", "")[:100],
+        "success": overall_success,
+        "steps": len(steps),
+        "timestamp": now,
+    }
+
+    # Store the completed trajectory, append it to the index (last 100 kept)
+    # and drop the active marker - one store load and one write
+    api.memory_store_many(
+        {f"trajectory:{project}:{trajectory_id}": trajectory},
+        now=now,
+        delete=(f"trajectory:{project}:active",),
+        append={f"trajectory:{project}:index": index_entry},
+        keep_last=INDEX_MAX_ENTRIES,
     )
-    # Keep last 100 trajectories
-    index = index[-100:]
-    memory_store(f"trajectory:{project}:index", index)
 
     # Clear active trajectory
     clear_active_trajectory()
 
-    # Clear MCP active marker (use empty dict instead of None for JSON safety)
-    memory_store(f"trajectory:{project}:active", {"cleared": True, "at": now})
-
-    log(f"Ended trajectory {trajectory_id}: success={overall_success}, steps={len(steps)}, rate={success_rate:.2f}")
+    log(
+        f"Ended trajectory {trajectory_id}: success={overall_success}, steps={len(steps)}, rate={success_rate:.2f}",
+        now,
+    )
 
     return {}
 
 
+EVENTS = ("start", "step", "end")
+USAGE = "usage: trajectory_tracker.py --event={start,step,end}"
+
+
+def parse_event(argv: list[str]) -> str | None:
+    """Return the --event value (--event=X or --event X), or None if missing/invalid."""
+    for i, arg in enumerate(argv):
+        if arg.startswith("--event="):
+            event = arg[len("--event=") :]
+        elif arg == "--event" and i + 1 < len(argv):
+            event = argv[i + 1]
+        else:
+            continue
+        return event if event in EVENTS else None
+    return None
+
+
 def main():
     """Main entry point."""
-    parser = argparse.ArgumentParser(description="Trajectory Tracker Hook")
-    parser.add_argument(
-        "--event",
-        choices=["start", "step", "end"],
-        required=True,
-        help="Event type: start (PreToolUse), step (PostToolUse), end (Stop)",
-    )
-    args = parser.parse_args()
+    event = parse_event(sys.argv[1:])
+    if event is None:
+        print(USAGE, file=sys.stderr)
+        return 2
 
     # Read hook input from stdin
     hook_input = {}
     if not sys.stdin.isatty():
-        with contextlib.suppress(json.JSONDecodeError):
-            hook_input = json.load(sys.stdin)
+        with contextlib.suppress(fastjson.JSONDecodeError):
+            hook_input = fastjson.load_stdin()
 
     try:
-        if args.event == "start":
+        if event == "start":
             result = on_start(hook_input)
-        elif args.event == "step":
+        elif event == "step":
             result = on_step(hook_input)
-        else:  # args.event == "end" (validated by argparse choices)
+        else:  # event == "end" (validated by parse_event)
             result = on_end(hook_input)
 
-        print(json.dumps(result))
+        if result:
+            fastjson.emit(result)
+        else:
+            fastjson.write_stdout(_EMPTY)
         return 0
 
     except Exception as e:
-        log(f"Error in {args.event}: {e}")
-        print(json.dumps({}))
+        log(f"Error in {event}: {e}")
+        fastjson.write_stdout(_EMPTY)
         return 0
 
 
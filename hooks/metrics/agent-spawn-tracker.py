@@ -8,7 +8,9 @@ This is the KISS solution since Claude Code doesn't expose per-agent token usage
 Logs to: .claude/stats/agent_spawns.jsonl
 """
 
+import atexit
 import json
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -16,18 +18,43 @@ from pathlib import Path
 STATS_DIR = Path.cwd() / ".claude" / "stats"
 AGENT_SPAWNS_LOG = STATS_DIR / "agent_spawns.jsonl"
 
+# Empty hook response (this hook never modifies the call), serialized once
+_EMPTY = "{}\n"
 
-def main():
+# Opened on the first Task call, then reused: most invocations are other
+# tools and should not create .claude/stats in the working directory
+_log_fd: int | None = None
+
+
+def _close_log() -> None:
+    """Close the log fd at exit."""
+    global _log_fd
+    if _log_fd is not None:
+        os.close(_log_fd)
+        _log_fd = None
+
+
+def _get_log_fd() -> int:
+    """Return the append-only spawn log fd, opening it on first use."""
+    global _log_fd
+    if _log_fd is None:
+        STATS_DIR.mkdir(parents=True, exist_ok=True)
+        _log_fd = os.open(AGENT_SPAWNS_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        atexit.register(_close_log)
+    return _log_fd
+
+
+def main() -> None:
     try:
         input_data = json.load(sys.stdin)
     except json.JSONDecodeError:
-        print(json.dumps({}))
+        sys.stdout.write(_EMPTY)
         sys.exit(0)
 
     # Only intercept Task tool calls
     tool_name = input_data.get("tool_name", "")
     if tool_name != "Task":
-        print(json.dumps({}))
+        sys.stdout.write(_EMPTY)
         sys.exit(0)
 
     # Extract agent info from tool input
@@ -50,8 +77,6 @@ def main():
     prompt_preview = tool_input.get("prompt", "")[:200]  # First 200 chars
 
     # Log the spawn
-    STATS_DIR.mkdir(parents=True, exist_ok=True)
-
     log_entry = {
         "timestamp": datetime.now().isoformat(),
         "event": "agent_spawn",
@@ -61,11 +86,11 @@ def main():
         "session_id": input_data.get("session_id", "unknown"),
     }
 
-    with open(AGENT_SPAWNS_LOG, "a") as f:
-        f.write(json.dumps(log_entry) + "\n")
+    # One O_APPEND write per line: atomic with concurrent writers, no lock needed
+    os.write(_get_log_fd(), (json.dumps(log_entry) + "\n").encode())
 
     # Don't block - just log and continue
-    print(json.dumps({}))
+    sys.stdout.write(_EMPTY)
     sys.exit(0)
 
 
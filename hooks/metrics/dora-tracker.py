@@ -12,12 +12,22 @@ Tracks basic DORA-inspired metrics for Claude Code sessions:
 Logs to ~/.claude/metrics/daily.jsonl for analysis.
 """
 
+import atexit
 import json
 import os
+import sqlite3
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from core import fastjson
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import fastjson
+
 # Add scripts to path for QuestDB import
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
 try:
@@ -30,9 +40,22 @@ except ImportError:
 # Metrics storage
 METRICS_DIR = Path.home() / ".claude" / "metrics"
 DAILY_LOG = METRICS_DIR / "daily.jsonl"
-FILE_EDIT_LOG = METRICS_DIR / "file_edits.json"
+EDITS_DB = METRICS_DIR / "edits.db"
+FILE_EDIT_LOG = METRICS_DIR / "file_edits.json"  # Legacy; imported into EDITS_DB once
 SESSION_STATE = METRICS_DIR / "session_state.json"
 
+# Rework tracking: an edit within REWORK_WINDOW of the previous one is rework.
+# EDITS_DB keeps files edited in the last EDIT_HISTORY_DAYS, at most
+# MAX_TRACKED_FILES of them (most recently edited first), so it stays bounded.
+REWORK_WINDOW = 24 * 3600
+EDIT_HISTORY_DAYS = 30
+MAX_TRACKED_FILES = 5000
+
+# A Task response containing any of these counts as a failed agent run.
+# Plain `in` on the lowered text beats a compiled alternation (re.IGNORECASE
+# or not): CPython's substring search is much faster than the regex engine.
+AGENT_ERROR_MARKERS = ("error", "failed", "exception", "traceback", "cannot", "unable")
+
 
 def ensure_metrics_dir():
     """Create metrics directory if not exists."""
@@ -43,8 +66,8 @@ def get_session_state() -> dict:
     """Load or initialize session state for tracking."""
     if SESSION_STATE.exists():
         try:
-            return json.loads(SESSION_STATE.read_text())
-        except (json.JSONDecodeError, OSError):
+            return fastjson.loads(SESSION_STATE.read_bytes())
+        except (fastjson.JSONDecodeError, OSError):
             pass
 
     # Initialize new session
@@ -61,26 +84,25 @@ def get_session_state() -> dict:
 
 
 def save_session_state(state: dict):
-    """Save session state."""
+    """Save session state (compact, atomic replace: several hooks read this file)."""
     ensure_metrics_dir()
-    SESSION_STATE.write_text(json.dumps(state, indent=2))
+    fastjson.dump_file(SESSION_STATE, state)
 
 
-def update_session_stats(tool_name: str, success: bool):
-    """Update session statistics."""
-    state = get_session_state()
+def update_session_stats(state: dict, tool_name: str, success: bool):
+    """Update session statistics in state (saved by the caller)."""
     state["tool_calls"] = state.get("tool_calls", 0) + 1
     if not success:
         state["errors"] = state.get("errors", 0) + 1
     state["last_activity"] = datetime.now().isoformat()
-    save_session_state(state)
+    state["last_activity_epoch"] = time.time()  # Compared by session_start_tracker without parsing
     return state
 
 
-def track_task_cycle(task_id: str, status: str):
-    """Track task start/completion for cycle time and iterations."""
-    state = get_session_state()
-    now = datetime.now().isoformat()
+def track_task_cycle(state: dict, task_id: str, status: str):
+    """Track task start/completion for cycle time and iterations in state (saved by the caller)."""
+    now_epoch = time.time()
+    now = datetime.fromtimestamp(now_epoch).isoformat()
 
     if status == "in_progress":
         if task_id not in [t["id"] for t in state.get("tasks_started", [])]:
@@ -88,6 +110,7 @@ def track_task_cycle(task_id: str, status: str):
                 {
                     "id": task_id,
                     "start_time": now,
+                    "start_epoch": now_epoch,  # Cycle time without parsing start_time back
                 }
             )
             # Initialize iteration counter
@@ -97,9 +120,10 @@ def track_task_cycle(task_id: str, status: str):
         started = state.get("tasks_started", [])
         for task in started:
             if task["id"] == task_id:
-                cycle_time_seconds = (
-                    datetime.fromisoformat(now) - datetime.fromisoformat(task["start_time"])
-                ).total_seconds()
+                start_epoch = task.get("start_epoch")
+                if start_epoch is None:  # Started before start_epoch was recorded
+                    start_epoch = datetime.fromisoformat(task["start_time"]).timestamp()
+                cycle_time_seconds = now_epoch - start_epoch
 
                 iterations = state.get("task_iterations", {}).get(task_id, 0)
 
@@ -134,59 +158,132 @@ def track_task_cycle(task_id: str, status: str):
                 state.get("task_iterations", {}).pop(task_id, None)
                 break
 
-    save_session_state(state)
-
 
-def increment_task_iterations():
-    """Increment iteration count for all active tasks."""
-    state = get_session_state()
+def increment_task_iterations(state: dict):
+    """Increment iteration count for all active tasks in state (saved by the caller)."""
     task_iterations = state.get("task_iterations", {})
 
     for task_id in task_iterations:
         task_iterations[task_id] += 1
 
     state["task_iterations"] = task_iterations
-    save_session_state(state)
 
 
-def load_file_edits() -> dict:
-    """Load file edit history for rework tracking."""
-    if FILE_EDIT_LOG.exists():
-        try:
-            return json.loads(FILE_EDIT_LOG.read_text())
-        except (json.JSONDecodeError, OSError):
-            return {}
-    return {}
+_edits_conn: sqlite3.Connection | None = None
+
+
+def _get_edits_conn() -> sqlite3.Connection:
+    """Get or create the edits.db connection (autocommit, WAL).
+
+    Creating the database imports file_edits.json, so rework history carries over.
+    """
+    global _edits_conn
+    if _edits_conn is None:
+        ensure_metrics_dir()
+        is_new = not EDITS_DB.exists()
+        conn = sqlite3.connect(EDITS_DB, isolation_level=None, timeout=1.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS edits (path TEXT PRIMARY KEY, last_edit REAL, rework_count INTEGER)")
+        conn.execute("CREATE INDEX IF NOT EXISTS edits_by_time ON edits (last_edit)")
+        if is_new:
+            conn.executemany(
+                "INSERT OR IGNORE INTO edits (path, last_edit, rework_count) VALUES (?, ?, ?)",
+                [
+                    (path, entry.get("last_edit", 0), entry.get("rework_count", 0))
+                    for path, entry in _load_legacy_file_edits().items()
+                ],
+            )
+        _edits_conn = conn
+    return _edits_conn
 
 
-def save_file_edits(edits: dict):
-    """Save file edit history."""
-    ensure_metrics_dir()
-    FILE_EDIT_LOG.write_text(json.dumps(edits, indent=2))
+def _load_legacy_file_edits() -> dict:
+    """Load the pre-edits.db file_edits.json history ({} if missing or unreadable)."""
+    try:
+        return fastjson.loads(FILE_EDIT_LOG.read_bytes())
+    except (fastjson.JSONDecodeError, OSError):
+        return {}
+
+
+def load_file_edits() -> dict:
+    """Load file edit history as {path: {"last_edit", "rework_count"}}."""
+    if not EDITS_DB.exists():
+        return _load_legacy_file_edits()
+    rows = _get_edits_conn().execute("SELECT path, last_edit, rework_count FROM edits")
+    return {path: {"last_edit": last_edit, "rework_count": rework_count} for path, last_edit, rework_count in rows}
 
 
 def calculate_rework_rate(file_path: str) -> float:
-    """Calculate if this is a rework (edit within 24h of last edit)."""
-    edits = load_file_edits()
-    now = datetime.now().timestamp()
-
-    if file_path in edits:
-        last_edit = edits[file_path]["last_edit"]
-        hours_since = (now - last_edit) / 3600
-
-        if hours_since < 24:
-            edits[file_path]["rework_count"] = edits[file_path].get("rework_count", 0) + 1
-            edits[file_path]["last_edit"] = now
-            save_file_edits(edits)
-            return 1.0  # This is a rework
-
-    # New file or first edit in 24h
-    edits[file_path] = {
-        "last_edit": now,
-        "rework_count": edits.get(file_path, {}).get("rework_count", 0),
-    }
-    save_file_edits(edits)
-    return 0.0
+    """Calculate if this is a rework (edit within 24h of last edit).
+
+    One transaction: read the previous edit time, upsert the row, then evict
+    entries past EDIT_HISTORY_DAYS and beyond MAX_TRACKED_FILES (both indexed).
+    """
+    conn = _get_edits_conn()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT last_edit FROM edits WHERE path = ?", (file_path,)).fetchone()
+        rework = row is not None and now - row[0] < REWORK_WINDOW
+        conn.execute(
+            "INSERT INTO edits (path, last_edit, rework_count) VALUES (?, ?, 0)"
+            " ON CONFLICT (path) DO UPDATE SET last_edit = excluded.last_edit, rework_count = rework_count + ?",
+            (file_path, now, int(rework)),
+        )
+        conn.execute("DELETE FROM edits WHERE last_edit < ?", (now - EDIT_HISTORY_DAYS * 86400,))
+        # The row just written is the newest, so the cap never evicts it
+        conn.execute(
+            "DELETE FROM edits WHERE last_edit < "
+            "(SELECT last_edit FROM edits ORDER BY last_edit DESC LIMIT 1 OFFSET ?)",
+            (MAX_TRACKED_FILES - 1,),
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return 1.0 if rework else 0.0
+
+
+# Git facts for this run: (root, branch, short commit), looked up once
+_git_state: tuple[str | None, str | None, str | None] | None = None
+
+
+def _get_git_state() -> tuple[str | None, str | None, str | None]:
+    """Get repo root, branch and short commit, cached for the life of the hook process.
+
+    Two git calls: --short implies --verify (a single revision), so the
+    abbreviated commit cannot share a rev-parse with the other two.
+    """
+    global _git_state
+    if _git_state is None:
+        _git_state = (None, None, None)
+        try:
+            import subprocess
+
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel", "--abbrev-ref", "HEAD"],
+                capture_output=True,
+                text=True,
+                timeout=2,
+            )
+            # Outside a repo nothing prints; in a repo without commits only the root does
+            lines = [line.strip() for line in result.stdout.splitlines()]
+            if not lines:
+                return _git_state
+            root = lines[0]
+            branch = lines[1] if result.returncode == 0 and len(lines) == 2 else None
+
+            result = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                timeout=2,
+            )
+            commit = result.stdout.strip() if result.returncode == 0 else None
+            _git_state = (root, branch, commit)
+        except Exception:
+            pass
+    return _git_state
 
 
 def get_project_name() -> str:
@@ -197,19 +294,9 @@ def get_project_name() -> str:
         return env_name
 
     # Try git repo name
-    try:
-        import subprocess
-
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            capture_output=True,
-            text=True,
-            timeout=2,
-        )
-        if result.returncode == 0:
-            return Path(result.stdout.strip()).name
-    except Exception:
-        pass
+    root = _get_git_state()[0]
+    if root:
+        return Path(root).name
 
     # Fallback to current directory name
     return Path.cwd().name
@@ -217,35 +304,31 @@ def get_project_name() -> str:
 
 def get_git_info() -> dict:
     """Get current git commit info for correlation."""
-    try:
-        import subprocess
-
-        # Get current commit hash
-        result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
-            capture_output=True,
-            text=True,
-            timeout=2,
-        )
-        commit = result.stdout.strip() if result.returncode == 0 else None
-
-        # Get current branch
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            capture_output=True,
-            text=True,
-            timeout=2,
-        )
-        branch = result.stdout.strip() if result.returncode == 0 else None
+    _root, branch, commit = _get_git_state()
+    return {"commit": commit, "branch": branch}
 
-        return {"commit": commit, "branch": branch}
-    except Exception:
-        return {"commit": None, "branch": None}
 
+# Metric lines logged during this run, written to DAILY_LOG in one append at exit
+_pending_metrics: list[str] = []
 
-def log_metric(metric_type: str, data: dict):
-    """Append metric to daily log."""
+
+def _flush_metrics():
+    """Append all pending metric lines with a single O_APPEND write."""
+    if not _pending_metrics:
+        return
     ensure_metrics_dir()
+    fd = os.open(DAILY_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+    try:
+        os.write(fd, "".join(_pending_metrics).encode())
+    finally:
+        os.close(fd)
+    _pending_metrics.clear()
+
+
+def log_metric(metric_type: str, data: dict):
+    """Queue metric for the daily log (flushed once at exit)."""
+    if not _pending_metrics:
+        atexit.register(_flush_metrics)
 
     git_info = get_git_info()
     entry = {
@@ -258,8 +341,7 @@ def log_metric(metric_type: str, data: dict):
         **data,
     }
 
-    with open(DAILY_LOG, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+    _pending_metrics.append(json.dumps(entry) + "\n")
 
 
 def main():
@@ -272,12 +354,21 @@ def main():
     tool_name = input_data.get("tool_name", "")
     tool_input = input_data.get("tool_input", {})
     tool_response = input_data.get("tool_response", {})
+    # Lowered once; every success/failure check below scans this copy
+    response_text = str(tool_response).lower()
+
+    # Session state is read once, updated in memory below and saved once
+    session_state = get_session_state()
 
     # Track file edits for rework rate
     if tool_name in ["Write", "Edit", "MultiEdit"]:
         file_path = tool_input.get("file_path", "")
         if file_path:
-            rework = calculate_rework_rate(file_path)
+            try:
+                rework = calculate_rework_rate(file_path)
+            except sqlite3.Error:
+                # edits.db locked by concurrent hooks: count the edit, not as rework
+                rework = 0.0
             log_metric("file_edit", {"file": file_path, "tool": tool_name, "is_rework": rework > 0})
             # Log rework to QuestDB
             if _questdb and rework > 0:
@@ -289,8 +380,7 @@ def main():
         command = tool_input.get("command", "")
         if "pytest" in command or "test" in command.lower():
             # Try to detect pass/fail from response
-            response_text = str(tool_response)
-            passed = "passed" in response_text.lower() and "failed" not in response_text.lower()
+            passed = "passed" in response_text and "failed" not in response_text
 
             log_metric(
                 "test_run",
@@ -306,10 +396,7 @@ def main():
         description = tool_input.get("description", "")[:100]
 
         # Detect success/failure from response
-        response_text = str(tool_response).lower()
-        success = not any(
-            err in response_text for err in ["error", "failed", "exception", "traceback", "cannot", "unable"]
-        )
+        success = not any(err in response_text for err in AGENT_ERROR_MARKERS)
 
         log_metric(
             "agent_spawn",
@@ -342,15 +429,15 @@ def main():
             task_id = todo.get("content", "")[:50]  # Use content as ID
             status = todo.get("status", "")
             if status in ["in_progress", "completed"]:
-                track_task_cycle(task_id, status)
+                track_task_cycle(session_state, task_id, status)
 
     # Update session stats for all tools
-    response_text = str(tool_response)
-    success = "error" not in response_text.lower()
-    session_state = update_session_stats(tool_name, success)
+    success = "error" not in response_text
+    update_session_stats(session_state, tool_name, success)
 
     # Increment iterations for active tasks
-    increment_task_iterations()
+    increment_task_iterations(session_state)
+    save_session_state(session_state)
 
     # Log session summary periodically (every 10 calls)
     if session_state.get("tool_calls", 0) % 10 == 0:
@@ -397,7 +484,7 @@ def check_thresholds(session_state: dict) -> list[str]:
         if error_rate > 0.15:
             alerts.append(f"High error rate: {error_rate:.1%} (threshold: 15%)")
 
-    # Rework rate - check file_edits.json
+    # Rework rate - check edits.db
     try:
         file_edits = load_file_edits()
         if file_edits:
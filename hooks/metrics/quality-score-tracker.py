@@ -15,6 +15,8 @@ Writes to QuestDB: claude_quality_scores table
 Alerts Discord if total < 70
 """
 
+import atexit
+import contextlib
 import json
 import os
 import re
@@ -26,6 +28,11 @@ from pathlib import Path
 
 QUESTDB_HOST = "localhost"
 QUESTDB_PORT = 9009
+QUESTDB_BATCH_BYTES = 8192  # Queued ILP lines are written once they reach this size
+
+# Socket singleton for connection reuse, and the ILP lines not yet written
+_socket: socket.socket | None = None
+_pending = bytearray()
 
 # Discord webhook for alerts (from environment)
 DISCORD_WEBHOOK = os.environ.get("DISCORD_WEBHOOK_QUALITY", "")
@@ -41,23 +48,87 @@ WEIGHTS = {
 # Alert threshold
 ALERT_THRESHOLD = 70
 
+# Tool output patterns, compiled once at import
+_PASSED_RE = re.compile(r"(\d+)\s+passed")
+_FAILED_RE = re.compile(r"(\d+)\s+failed")
+_COV_TOTAL_RE = re.compile(r"TOTAL\s+\d+\s+\d+\s+(\d+)%")
+_COV_ALT_RE = re.compile(r"Coverage[:\s]+(\d+)%", re.IGNORECASE)
+# One scan for every ruff diagnostic, capturing the code's class letter
+# (E/F errors, W/C warnings). "Found N errors" stays a separate search: its
+# literal prefix lets re skip ahead, which an alternation would defeat.
+_RUFF_CODE_RE = re.compile(r"^.+:\d+:\d+: ([EFWC])\d+", re.MULTILINE)
+_FOUND_ERRORS_RE = re.compile(r"Found (\d+) errors?")
+_MYPY_ERROR_RE = re.compile(r"^.+:\d+: error:", re.MULTILINE)
+
 
 def escape_tag(value: str) -> str:
     """Escape special characters in ILP tag values."""
     return str(value).replace(" ", "\\ ").replace(",", "\\,").replace("=", "\\=")
 
 
-def send_to_questdb(line: str) -> bool:
-    """Send single ILP line to QuestDB."""
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(5)
-            s.connect((QUESTDB_HOST, QUESTDB_PORT))
-            s.sendall((line + "\n").encode())
+def _get_socket() -> socket.socket:
+    """Get or create the reusable ILP socket (keep-alive, connected once)."""
+    global _socket
+    if _socket is None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.settimeout(5)
+            sock.connect((QUESTDB_HOST, QUESTDB_PORT))
+        except OSError:
+            sock.close()
+            raise
+        _socket = sock
+    return _socket
+
+
+def _reset_socket():
+    """Drop the socket after an error; the next write reconnects."""
+    global _socket
+    if _socket is not None:
+        with contextlib.suppress(OSError):
+            _socket.close()
+        _socket = None
+
+
+def flush_questdb() -> bool:
+    """Write all queued ILP lines in one sendall.
+
+    Retries once on a fresh connection in case the reused one was closed by
+    the server. The queue is cleared whether or not the send succeeds.
+    """
+    if not _pending:
         return True
-    except Exception as e:
-        print(f"QuestDB error: {e}", file=sys.stderr)
-        return False
+
+    payload = bytes(_pending)
+    _pending.clear()
+
+    error: OSError | None = None
+    for _attempt in range(2):
+        try:
+            _get_socket().sendall(payload)
+            return True
+        except OSError as e:
+            error = e
+            _reset_socket()
+    print(f"QuestDB error: {error}", file=sys.stderr)
+    return False
+
+
+atexit.register(flush_questdb)
+
+
+def send_to_questdb(line: str) -> bool:
+    """Queue one ILP line for QuestDB.
+
+    The queue is written when it reaches QUESTDB_BATCH_BYTES, on
+    flush_questdb(), or at interpreter exit.
+    """
+    _pending.extend(line.encode())
+    _pending.extend(b"\n")
+    if len(_pending) >= QUESTDB_BATCH_BYTES:
+        return flush_questdb()
+    return True
 
 
 def send_discord_alert(project: str, score: float, breakdown: dict) -> None:
@@ -142,11 +213,11 @@ def parse_pytest_output(output: str) -> dict:
     result = {"pass_rate": 100, "coverage": 0, "passed": 0, "failed": 0}
 
     # Parse test results: "5 passed, 2 failed"
-    match = re.search(r"(\d+)\s+passed", output)
+    match = _PASSED_RE.search(output)
     if match:
         result["passed"] = int(match.group(1))
 
-    match = re.search(r"(\d+)\s+failed", output)
+    match = _FAILED_RE.search(output)
     if match:
         result["failed"] = int(match.group(1))
 
@@ -155,12 +226,12 @@ def parse_pytest_output(output: str) -> dict:
         result["pass_rate"] = (result["passed"] / total) * 100
 
     # Parse coverage: "TOTAL ... 85%"
-    match = re.search(r"TOTAL\s+\d+\s+\d+\s+(\d+)%", output)
+    match = _COV_TOTAL_RE.search(output)
     if match:
         result["coverage"] = int(match.group(1))
 
     # Alternative: "Coverage: 85%"
-    match = re.search(r"Coverage[:\s]+(\d+)%", output, re.IGNORECASE)
+    match = _COV_ALT_RE.search(output)
     if match:
         result["coverage"] = int(match.group(1))
 
@@ -171,18 +242,16 @@ def parse_ruff_output(output: str) -> dict:
     """Parse ruff output for linting score."""
     result = {"errors": 0, "warnings": 0, "score": 100}
 
-    # Count errors/warnings
-    error_matches = re.findall(r"^.+:\d+:\d+: [EF]\d+", output, re.MULTILINE)
-    warning_matches = re.findall(r"^.+:\d+:\d+: [WC]\d+", output, re.MULTILINE)
-
-    result["errors"] = len(error_matches)
-    result["warnings"] = len(warning_matches)
+    # Count errors/warnings in a single pass
+    codes = "".join(_RUFF_CODE_RE.findall(output))
+    result["errors"] = codes.count("E") + codes.count("F")
+    result["warnings"] = len(codes) - result["errors"]
 
     # Score: 100 - (errors * 5 + warnings * 1)
     result["score"] = max(0, 100 - (result["errors"] * 5 + result["warnings"] * 1))
 
     # Alternative: "Found X errors"
-    match = re.search(r"Found (\d+) errors?", output)
+    match = _FOUND_ERRORS_RE.search(output)
     if match:
         result["errors"] = int(match.group(1))
         result["score"] = max(0, 100 - result["errors"] * 5)
@@ -199,14 +268,13 @@ def parse_mypy_output(output: str) -> dict:
     result = {"errors": 0, "score": 100}
 
     # "Found X errors"
-    match = re.search(r"Found (\d+) errors?", output)
+    match = _FOUND_ERRORS_RE.search(output)
     if match:
         result["errors"] = int(match.group(1))
         result["score"] = max(0, 100 - result["errors"] * 3)
 
-    # Count error lines
-    error_lines = re.findall(r"^.+:\d+: error:", output, re.MULTILINE)
-    if error_lines and not match:
+    # Count error lines (only needed without the summary line)
+    if not match and (error_lines := _MYPY_ERROR_RE.findall(output)):
         result["errors"] = len(error_lines)
         result["score"] = max(0, 100 - result["errors"] * 3)
 
@@ -338,8 +406,9 @@ def main():
         f"{ts_now}"
     )
 
-    # Send to QuestDB
-    sent = send_to_questdb(line)
+    # Send to QuestDB (flushed now: the result below reports delivery)
+    send_to_questdb(line)
+    sent = flush_questdb()
 
     # Alert if score is low
     if total_score < ALERT_THRESHOLD:
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Compiled Hook Launcher
+
+Runs a per-prompt hook from its mypyc build (scripts/build_compiled_hooks.sh)
+when one exists in hooks/compiled/, and from the source script otherwise, so
+a hook config can point here before the build has run.
+
+Usage:
+  run_compiled.py session_start_tracker   # UserPromptSubmit
+  run_compiled.py agent_spawn_tracker     # PreToolUse (Task)
+"""
+
+import importlib
+import importlib.util
+import runpy
+import sys
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).parent
+COMPILED_DIR = HOOKS_DIR / "compiled"
+
+# Module name -> source script it is built from
+SOURCES = {
+    "session_start_tracker": HOOKS_DIR / "intelligence" / "session_start_tracker.py",
+    "agent_spawn_tracker": HOOKS_DIR / "metrics" / "agent-spawn-tracker.py",
+}
+
+
+def main() -> int:
+    name = sys.argv[1] if len(sys.argv) > 1 else ""
+    source = SOURCES.get(name)
+    if source is None:
+        print(f"usage: run_compiled.py {{{','.join(SOURCES)}}}", file=sys.stderr)
+        return 2
+
+    sys.argv = [str(source), *sys.argv[2:]]
+    # compiled/ holds only extension modules; hooks/ makes `core` importable
+    sys.path[:0] = [str(COMPILED_DIR), str(HOOKS_DIR)]
+
+    if importlib.util.find_spec(name) is None:
+        runpy.run_path(str(source), run_name="__main__")
+    else:
+        importlib.import_module(name).main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,14 +15,22 @@ The SSOT is then read by session_start_tracker.py on next session start.
 import contextlib
 import json
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from core import state_codec
+except ImportError:
+    # Running as script: make hooks/ importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from core import state_codec
+
 # File paths
 METRICS_DIR = Path.home() / ".claude" / "metrics"
 CONTEXT_STATS_FILE = METRICS_DIR / "context_stats.json"
 TIPS_FILE = METRICS_DIR / "last_session_tips.json"
-STATS_FILE = METRICS_DIR / "last_session_stats.json"
+STATS_FILE = METRICS_DIR / "last_session_stats.json"  # Via state_codec
 INSIGHTS_FILE = METRICS_DIR / "session_insights.json"
 
 
@@ -46,6 +54,7 @@ def main():
             "$schema": "session_insights_v1",
             "session_id": session_id,
             "ended_at": datetime.now().isoformat(),
+            "ended_epoch": time.time(),
         }
 
         # 1. Read context stats (from context-preservation.py)
@@ -77,7 +86,10 @@ def main():
                 }
 
         # 3. Read git stats (from session_analyzer.py)
-        if stats_data := load_json_safe(STATS_FILE):
+        stats_data = None
+        with contextlib.suppress(Exception):
+            stats_data = state_codec.load(STATS_FILE)
+        if stats_data:
             if git_data := stats_data.get("git"):
                 insights["git"] = {
                     "uncommitted": git_data.get("has_changes", False),
@@ -0,0 +1,33 @@
+#!/bin/bash
+set -euo pipefail
+
+# Compiled Hooks Build
+# Compiles the per-prompt hooks with mypyc into hooks/compiled/, where
+# hooks/run_compiled.py picks them up. Rebuild after editing the sources.
+# Usage: build_compiled_hooks.sh        (needs the dev extras: mypy ships mypyc)
+
+ROOT="$(cd "$(dirname "$0")/.." && pwd)"
+OUT="$ROOT/hooks/compiled"
+
+if ! command -v mypyc >/dev/null; then
+  echo "ERROR: mypyc not found (pip install -e '.[dev]')"
+  exit 1
+fi
+
+BUILD="$(mktemp -d)"
+trap 'rm -rf "$BUILD"' EXIT
+
+# Module names must be identifiers: agent-spawn-tracker.py builds as agent_spawn_tracker
+cp "$ROOT/hooks/intelligence/session_start_tracker.py" "$BUILD/session_start_tracker.py"
+cp "$ROOT/hooks/metrics/agent-spawn-tracker.py" "$BUILD/agent_spawn_tracker.py"
+
+(
+  cd "$BUILD"
+  MYPYPATH="$ROOT/hooks" mypyc --config-file "$ROOT/pyproject.toml" session_start_tracker.py agent_spawn_tracker.py
+)
+
+rm -rf "$OUT"
+mkdir -p "$OUT"
+cp "$BUILD"/*.so "$OUT/"
+echo "Built: $(cd "$OUT" && ls *.so | tr '\n' ' ')"
+echo "Hook commands: python3 $ROOT/hooks/run_compiled.py {session_start_tracker,agent_spawn_tracker}"
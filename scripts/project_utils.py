@@ -14,8 +14,8 @@ from functools import lru_cache
 from pathlib import Path
 
 
-@lru_cache(maxsize=1)
-def get_project_name() -> str:
+@lru_cache(maxsize=16)
+def get_project_name(cwd: str | None = None) -> str:
     """
     Auto-detect project name with fallback chain.
 
@@ -24,6 +24,9 @@ def get_project_name() -> str:
     2. Git repo root directory name
     3. Current working directory name
 
+    Args:
+        cwd: Directory to detect the project for (default: current directory)
+
     Returns:
         Project name string (never empty, defaults to 'unknown')
     """
@@ -38,7 +41,7 @@ def get_project_name() -> str:
             capture_output=True,
             text=True,
             timeout=2,
-            cwd=os.getcwd(),
+            cwd=cwd or os.getcwd(),
         )
         if result.returncode == 0:
             git_root = result.stdout.strip()
@@ -48,7 +51,7 @@ def get_project_name() -> str:
         pass
 
     # 3. Fallback to current directory name
-    cwd = os.getcwd()
+    cwd = cwd or os.getcwd()
     if cwd and cwd != "/":
         return Path(cwd).name
 
@@ -11,17 +11,39 @@ USAGE:
     writer = QuestDBMetrics()
     writer.log_tool_use("session_123", "Edit", {"file": "main.py"})
 
+    # Batched: several rows, one socket write
+    writer.buffer_tool_use("session_123", "Edit")
+    writer.buffer_event("session_123", "timeout", "Edit")
+    writer.flush()
+
 ENV VARIABLES:
     QUESTDB_HOST: QuestDB host (default: localhost)
     QUESTDB_ILP_PORT: QuestDB ILP port (default: 9009)
+    QUESTDB_PROTO: ILP transport, "tcp" or "http" (default: tcp)
+    QUESTDB_HTTP_PORT: QuestDB HTTP port for ILP/HTTP (default: 9000)
+
+TIMESTAMPS:
+    ILP/HTTP rows carry microsecond timestamps (POST /write?precision=us):
+    hook metrics need nothing finer, and shorter values delta-encode better.
+    ILP/TCP has no per-request precision, so TCP rows stay in nanoseconds
+    (the server default).
+
+TOOL EVENTS:
+    Hook errors/blocks are tagged on the claude_tool_usage row itself
+    (event_type tag + error field). post-tool-use still writes the
+    claude_events row too, in the same flush, because existing queries and
+    dashboards read that table; drop the second row only together with a
+    migration that moves those readers.
 """
 
 import contextlib
+import gzip
+import http.client
 import os
 import socket
 import sys
 import threading
-from datetime import datetime
+import time
 from pathlib import Path
 
 # Import project auto-detect
@@ -30,7 +52,7 @@ try:
     from project_utils import get_project_name
 except ImportError:
 
-    def get_project_name():
+    def get_project_name(cwd=None):
         return os.getenv("CLAUDE_PROJECT_NAME", "unknown")
 
 
@@ -41,6 +63,16 @@ _socket_lock = threading.Lock()
 # Config
 QUESTDB_HOST = os.environ.get("QUESTDB_HOST", "localhost")
 QUESTDB_ILP_PORT = int(os.environ.get("QUESTDB_ILP_PORT", "9009"))
+QUESTDB_PROTO = os.environ.get("QUESTDB_PROTO", "tcp").lower()
+QUESTDB_HTTP_PORT = int(os.environ.get("QUESTDB_HTTP_PORT", "9000"))
+
+# Keep-alive HTTP connection singleton (ILP/HTTP transport)
+_http_conn = None
+_HTTP_HEADERS = {"Content-Encoding": "gzip", "Content-Type": "text/plain"}
+
+# Coarsest precision each transport can declare (see TIMESTAMPS above)
+_HTTP_WRITE_PATH = "/write?precision=us"
+_TS_DIVISOR = 1000 if QUESTDB_PROTO == "http" else 1
 
 
 def _get_socket() -> socket.socket | None:
@@ -68,6 +100,77 @@ def _reset_socket():
             _socket = None
 
 
+def _get_http_conn() -> http.client.HTTPConnection:
+    """Get or create reusable keep-alive HTTP connection."""
+    global _http_conn
+    if _http_conn is None:
+        with _socket_lock:
+            if _http_conn is None:
+                _http_conn = http.client.HTTPConnection(QUESTDB_HOST, QUESTDB_HTTP_PORT, timeout=2.0)
+    return _http_conn
+
+
+def _reset_http_conn():
+    """Reset HTTP connection on error."""
+    global _http_conn
+    with _socket_lock:
+        if _http_conn:
+            with contextlib.suppress(Exception):
+                _http_conn.close()
+            _http_conn = None
+
+
+def _post_ilp(payload: bytes) -> bool:
+    """POST gzip-compressed ILP lines to QuestDB /write.
+
+    Retries once on a fresh connection only if sending the request fails (the
+    kept-alive one was closed by the server). Once the request is out, QuestDB
+    may have written the rows, so a failed response is not retried.
+    """
+    body = gzip.compress(payload)
+    for _attempt in range(2):
+        try:
+            conn = _get_http_conn()
+            conn.request("POST", _HTTP_WRITE_PATH, body=body, headers=_HTTP_HEADERS)
+        except (OSError, http.client.HTTPException):
+            _reset_http_conn()
+            continue
+        try:
+            resp = conn.getresponse()
+            resp.read()
+        except (OSError, http.client.HTTPException):
+            _reset_http_conn()
+            return False
+        return 200 <= resp.status < 300
+    return False
+
+
+def _send_tcp(payload: bytes) -> bool:
+    """Write ILP lines to the reusable TCP socket."""
+    sock = _get_socket()
+    if not sock:
+        return False
+
+    try:
+        sock.sendall(payload)
+        return True
+    except OSError:
+        _reset_socket()
+        return False
+
+
+def _write(payload: bytes) -> bool:
+    """Send ILP payload over the configured transport."""
+    if QUESTDB_PROTO == "http":
+        return _post_ilp(payload)
+    return _send_tcp(payload)
+
+
+def _now_ts() -> int:
+    """Current time as an integer ILP timestamp in the transport's precision."""
+    return time.time_ns() // _TS_DIVISOR
+
+
 def _escape_tag(value: str) -> str:
     """Escape tag value for ILP."""
     return value.replace(" ", "\\ ").replace(",", "\\,").replace("=", "\\=")
@@ -78,11 +181,11 @@ def _escape_field_str(value: str) -> str:
     return value.replace("\\", "\\\\").replace('"', '\\"')
 
 
-def _to_ilp(table: str, tags: dict, fields: dict, timestamp_ns: int) -> str:
+def _to_ilp(table: str, tags: dict, fields: dict, timestamp: int) -> str:
     """Convert to ILP line."""
-    # Tags
+    # Tags (sorted by key, the column order ILP ingestion handles best)
     tag_parts = []
-    for k, v in tags.items():
+    for k, v in sorted(tags.items()):
         if v:
             tag_parts.append(f"{k}={_escape_tag(str(v))}")
     tag_str = ",".join(tag_parts)
@@ -107,8 +210,8 @@ def _to_ilp(table: str, tags: dict, fields: dict, timestamp_ns: int) -> str:
     field_str = ",".join(field_parts)
 
     if tag_str:
-        return f"{table},{tag_str} {field_str} {timestamp_ns}"
-    return f"{table} {field_str} {timestamp_ns}"
+        return f"{table},{tag_str} {field_str} {timestamp}"
+    return f"{table} {field_str} {timestamp}"
 
 
 class QuestDBMetrics:
@@ -117,24 +220,37 @@ class QuestDBMetrics:
     def __init__(self, project_name: str = None):
         """Initialize with optional project name override."""
         self.project_name = project_name or get_project_name()
+        self._buffer = bytearray()
 
     def _send(self, line: str) -> bool:
         """Send ILP line to QuestDB."""
         if not line:
             return False
 
-        sock = _get_socket()
-        if not sock:
+        return _write((line + "\n").encode())
+
+    def _buffer_line(self, line: str) -> bool:
+        """Append ILP line to the pending batch (sent by flush())."""
+        if not line:
             return False
+        self._buffer += line.encode()
+        self._buffer += b"\n"
+        return True
 
-        try:
-            sock.sendall((line + "\n").encode())
+    def flush(self) -> bool:
+        """Send all buffered ILP lines in a single write.
+
+        The buffer is cleared whether or not the send succeeds.
+        """
+        if not self._buffer:
             return True
-        except OSError:
-            _reset_socket()
-            return False
 
-    def log_tool_use(
+        payload = bytes(self._buffer)
+        self._buffer.clear()
+
+        return _write(payload)
+
+    def _tool_use_line(
         self,
         session_id: str,
         tool_name: str,
@@ -142,19 +258,16 @@ class QuestDBMetrics:
         duration_ms: int = 0,
         success: bool = True,
         error: str = None,
-    ) -> bool:
-        """
-        Log tool usage to QuestDB.
-
-        Table: claude_tool_usage
-        Tags: project, session_id, tool_name
-        Fields: duration_ms, success, error, params_summary
-        """
+        event_type: str = None,
+    ) -> str:
+        """Build claude_tool_usage ILP line."""
         tags = {
             "project": self.project_name,
             "session_id": session_id[:50] if session_id else "unknown",
             "tool_name": tool_name or "unknown",
         }
+        if event_type:
+            tags["event_type"] = event_type
 
         # Summarize params (keep it short for QuestDB)
         params_summary = ""
@@ -176,24 +289,82 @@ class QuestDBMetrics:
         if params_summary:
             fields["params"] = params_summary
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("claude_tool_usage", tags, fields, timestamp_ns)
+        return _to_ilp("claude_tool_usage", tags, fields, _now_ts())
 
-        return self._send(line)
+    def log_tool_use(
+        self,
+        session_id: str,
+        tool_name: str,
+        tool_params: dict = None,
+        duration_ms: int = 0,
+        success: bool = True,
+        error: str = None,
+        event_type: str = None,
+    ) -> bool:
+        """
+        Log tool usage to QuestDB.
 
-    def log_event(
+        Table: claude_tool_usage
+        Tags: project, session_id, tool_name, event_type (only for errors/blocks)
+        Fields: duration_ms, success, error, params_summary
+        """
+        return self._send(
+            self._tool_use_line(session_id, tool_name, tool_params, duration_ms, success, error, event_type)
+        )
+
+    def buffer_tool_use(
+        self,
+        session_id: str,
+        tool_name: str,
+        tool_params: dict = None,
+        duration_ms: int = 0,
+        success: bool = True,
+        error: str = None,
+        event_type: str = None,
+    ) -> bool:
+        """Like log_tool_use(), but queue the row until flush()."""
+        return self._buffer_line(
+            self._tool_use_line(session_id, tool_name, tool_params, duration_ms, success, error, event_type)
+        )
+
+    def buffer_tool_aggregate(
+        self,
+        session_id: str,
+        tool_name: str,
+        count: int,
+        sum_duration_ms: int,
+        max_duration_ms: int,
+        project_name: str | None = None,
+    ) -> bool:
+        """Queue one claude_tool_usage row summarizing `count` successful calls.
+
+        duration_ms carries the mean so per-row averages stay comparable.
+        project_name overrides the writer's project (calls made in another
+        session's working directory).
+        """
+        tags = {
+            "project": project_name or self.project_name,
+            "session_id": session_id[:50] if session_id else "unknown",
+            "tool_name": tool_name or "unknown",
+        }
+        fields = {
+            "duration_ms": sum_duration_ms // count if count else 0,
+            "success": True,
+            "count": count,
+            "sum_duration_ms": sum_duration_ms,
+            "max_duration_ms": max_duration_ms,
+        }
+        return self._buffer_line(_to_ilp("claude_tool_usage", tags, fields, _now_ts()))
+
+    def _event_line(
         self,
         session_id: str,
         event_type: str,
         tool_name: str = None,
         error_message: str = None,
         severity: str = "medium",
-    ) -> bool:
-        """
-        Log event (error, block, etc) to QuestDB.
-
-        Table: claude_events
-        """
+    ) -> str:
+        """Build claude_events ILP line."""
         tags = {
             "project": self.project_name,
             "session_id": session_id[:50] if session_id else "unknown",
@@ -207,10 +378,33 @@ class QuestDBMetrics:
         if error_message:
             fields["error"] = error_message[:200]
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("claude_events", tags, fields, timestamp_ns)
+        return _to_ilp("claude_events", tags, fields, _now_ts())
 
-        return self._send(line)
+    def log_event(
+        self,
+        session_id: str,
+        event_type: str,
+        tool_name: str = None,
+        error_message: str = None,
+        severity: str = "medium",
+    ) -> bool:
+        """
+        Log event (error, block, etc) to QuestDB.
+
+        Table: claude_events
+        """
+        return self._send(self._event_line(session_id, event_type, tool_name, error_message, severity))
+
+    def buffer_event(
+        self,
+        session_id: str,
+        event_type: str,
+        tool_name: str = None,
+        error_message: str = None,
+        severity: str = "medium",
+    ) -> bool:
+        """Like log_event(), but queue the row until flush()."""
+        return self._buffer_line(self._event_line(session_id, event_type, tool_name, error_message, severity))
 
     def log_session_metric(
         self,
@@ -253,8 +447,7 @@ class QuestDBMetrics:
             "lines_removed": lines_removed,
         }
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("claude_sessions", tags, fields, timestamp_ns)
+        line = _to_ilp("claude_sessions", tags, fields, _now_ts())
 
         return self._send(line)
 
@@ -295,8 +488,7 @@ class QuestDBMetrics:
         if error:
             fields["error"] = error[:200]
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("claude_agents", tags, fields, timestamp_ns)
+        line = _to_ilp("claude_agents", tags, fields, _now_ts())
 
         return self._send(line)
 
@@ -333,8 +525,7 @@ class QuestDBMetrics:
         if error:
             fields["error"] = error[:200]
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("claude_hooks", tags, fields, timestamp_ns)
+        line = _to_ilp("claude_hooks", tags, fields, _now_ts())
 
         return self._send(line)
 
@@ -365,8 +556,7 @@ class QuestDBMetrics:
             "tokens_used": tokens_used,
         }
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("claude_tasks", tags, fields, timestamp_ns)
+        line = _to_ilp("claude_tasks", tags, fields, _now_ts())
 
         return self._send(line)
 
@@ -392,8 +582,7 @@ class QuestDBMetrics:
             "message_count": message_count,
         }
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("claude_context", tags, fields, timestamp_ns)
+        line = _to_ilp("claude_context", tags, fields, _now_ts())
 
         return self._send(line)
 
@@ -432,14 +621,14 @@ class QuestDBMetrics:
             "rework": rework,
         }
 
-        timestamp_ns = int(datetime.now().timestamp() * 1e9)
-        line = _to_ilp("dora_metrics", tags, fields, timestamp_ns)
+        line = _to_ilp("dora_metrics", tags, fields, _now_ts())
 
         return self._send(line)
 
     def close(self):
-        """Close socket connection (optional, for cleanup)."""
+        """Close socket/HTTP connections (optional, for cleanup)."""
         _reset_socket()
+        _reset_http_conn()
 
 
 # Convenience function for backward compatibility
@@ -6,7 +6,7 @@ Analyzes metrics from:
 - ~/.claude/metrics/daily.jsonl (DORA metrics)
 - ~/.claude/metrics/tdd_compliance.jsonl (TDD compliance)
 - ~/.claude/metrics/prompt_optimization.jsonl (Prompt optimization)
-- ~/.claude/metrics/file_edits.json (Rework tracking)
+- ~/.claude/metrics/edits.db (Rework tracking; legacy file_edits.json)
 - .claude/stats/session_metrics.jsonl (Token usage & costs)
 
 Usage:
@@ -15,6 +15,7 @@ Usage:
 
 import argparse
 import json
+import sqlite3
 from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -298,7 +299,19 @@ def analyze_prompt_optimization(entries: list[dict]) -> dict:
 
 
 def load_file_edits() -> dict:
-    """Load file edit tracking for rework analysis."""
+    """Load file edit tracking for rework analysis (edits.db, else legacy file_edits.json)."""
+    db_path = METRICS_DIR / "edits.db"
+    if db_path.exists():
+        try:
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            try:
+                rows = conn.execute("SELECT path, last_edit, rework_count FROM edits").fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return {}
+        return {path: {"last_edit": last_edit, "rework_count": rework_count} for path, last_edit, rework_count in rows}
+
     file_path = METRICS_DIR / "file_edits.json"
     if not file_path.exists():
         return {}
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+GH Cache Daemon
+===============
+Keeps strategy_router's gh query results in memory and serves them over a
+Unix socket, so a router invocation that hits the cache does no file I/O
+and spawns no process.
+
+Usage:
+    python gh_cache_daemon.py
+    # Or via systemd socket activation (gh-cache.socket + gh-cache.service)
+
+Protocol (SOCK_SEQPACKET, one JSON message each way):
+    request:  {"cmds": [["pr", "view", ...], ...], "ttl": 30, "cwd": "/repo"}
+    reply:    {"ok": true, "data": [<gh json or null>, ...]}
+
+Results are cached per (cwd, command), since gh answers for the repository
+it runs in. Failed gh calls return null and are not cached, matching the
+router's file cache.
+
+Environment Variables:
+    GH_CACHE_SOCKET - Socket path (default: ~/.claude/cache.sock)
+"""
+
+import contextlib
+import json
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("gh-cache")
+
+SOCKET_PATH = Path(os.getenv("GH_CACHE_SOCKET", str(Path.home() / ".claude" / "cache.sock")))
+GH_TIMEOUT = 10  # seconds, same as the router's own gh calls
+MAX_MESSAGE = 64 * 1024
+MAX_TTL = 300  # Never serve anything older than this, whatever the client asks
+
+# (cwd, command) -> (timestamp, data)
+_cache: dict[tuple[str, str], tuple[float, object]] = {}
+_cache_lock = threading.Lock()
+
+
+def run_gh(cmd: list[str], cwd: str) -> tuple[bool, object]:
+    """Run gh in cwd; (success, parsed JSON or None)."""
+    try:
+        r = subprocess.run(["gh", *cmd], capture_output=True, text=True, timeout=GH_TIMEOUT, cwd=cwd)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"gh {' '.join(cmd)} failed: {e}")
+        return False, None
+    if r.returncode != 0:
+        return False, None
+    try:
+        return True, json.loads(r.stdout) if r.stdout.strip() else None
+    except json.JSONDecodeError:
+        return False, None
+
+
+def cached_query(cmd: list[str], cwd: str, ttl: float) -> object:
+    """Return a cached gh result younger than ttl, running gh on a miss."""
+    key = (cwd, " ".join(cmd))
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is not None and time.time() - entry[0] < min(ttl, MAX_TTL):
+        return entry[1]
+
+    ok, data = run_gh(cmd, cwd)
+    if ok:
+        with _cache_lock:
+            _cache[key] = (time.time(), data)
+    return data
+
+
+def handle(conn: socket.socket, executor: ThreadPoolExecutor):
+    """Answer one request; misses for several commands run concurrently."""
+    with conn:
+        try:
+            request = json.loads(conn.recv(MAX_MESSAGE))
+            cmds = request["cmds"]
+            ttl = float(request.get("ttl", 30))
+            cwd = request.get("cwd") or str(Path.home())
+            futures = [executor.submit(cached_query, cmd, cwd, ttl) for cmd in cmds]
+            reply = {"ok": True, "data": [f.result() for f in futures]}
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            reply = {"ok": False, "error": str(e)}
+        except OSError:
+            return
+        with contextlib.suppress(OSError):
+            conn.send(json.dumps(reply, separators=(",", ":")).encode())
+
+
+def listen_socket() -> socket.socket:
+    """Return the listening socket: inherited from systemd, or bound here."""
+    if os.getenv("LISTEN_PID") == str(os.getpid()) and int(os.getenv("LISTEN_FDS", "0")) >= 1:
+        return socket.socket(fileno=3)  # SD_LISTEN_FDS_START
+
+    SOCKET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SOCKET_PATH.unlink(missing_ok=True)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    sock.bind(str(SOCKET_PATH))
+    os.chmod(SOCKET_PATH, 0o600)
+    sock.listen(16)
+    return sock
+
+
+def main():
+    sock = listen_socket()
+    logger.info(f"Serving gh cache on {sock.getsockname()}")
+    with sock, ThreadPoolExecutor(max_workers=8) as executor:
+        while True:
+            conn, _ = sock.accept()
+            threading.Thread(target=handle, args=(conn, executor), daemon=True).start()
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "hooks" / "i
 # =============================================================================
 
 
+@pytest.fixture(autouse=True)
+def lesson_cache(tmp_path):
+    """Point the cross-process search cache at a per-test file."""
+    with patch("lesson_injector.CACHE_FILE", tmp_path / "lesson_cache.json") as cache_file:
+        yield cache_file
+
+
 @pytest.fixture
 def mock_pattern_search():
     """Mock pattern_search from mcp_client."""
@@ -403,3 +410,89 @@ class TestHookIntegration:
             # Should be valid JSON
             result = json.loads(output)
             assert "additionalContext" in result
+
+
+# =============================================================================
+# Search Deadline Tests
+# =============================================================================
+
+
+class TestSearchDeadline:
+    """Tests for the deadline-bounded pattern_search call."""
+
+    def test_passes_deadline_as_search_timeout(self, mock_pattern_search, mock_get_project_name):
+        """Test that the search is bounded by SEARCH_TIMEOUT_SECONDS."""
+        mock_pattern_search.return_value = []
+
+        import lesson_injector
+
+        lesson_injector.process_hook({"prompt": "help", "cwd": "/tmp"})
+
+        assert mock_pattern_search.call_args.kwargs["timeout"] == lesson_injector.SEARCH_TIMEOUT_SECONDS
+
+    def test_query_keeps_prompt_text(self, mock_pattern_search, mock_get_project_name):
+        """Test that the prompt is searched as typed (no case folding)."""
+        mock_pattern_search.return_value = []
+
+        from lesson_injector import process_hook
+
+        process_hook({"prompt": "Fix the QuestDB ILP writer", "cwd": "/tmp"})
+
+        assert mock_pattern_search.call_args.kwargs["query"] == "Fix the QuestDB ILP writer"
+
+    def test_returns_empty_when_search_times_out(self, mock_pattern_search, mock_get_project_name):
+        """Test that a timed-out search (empty result) injects nothing."""
+        mock_pattern_search.return_value = []
+
+        from lesson_injector import process_hook
+
+        assert process_hook({"prompt": "slow search", "cwd": "/tmp"}) == {}
+
+
+# =============================================================================
+# Search Cache Tests
+# =============================================================================
+
+
+class TestSearchCache:
+    """Tests for the prompt-prefix search cache shared across hook processes."""
+
+    def test_repeated_prompt_served_from_cache(
+        self, mock_pattern_search, mock_get_project_name, high_confidence_patterns
+    ):
+        """Test that a prompt with the same prefix (any case) does not search again."""
+        mock_pattern_search.return_value = high_confidence_patterns
+
+        from lesson_injector import process_hook
+
+        first = process_hook({"prompt": "Write tests for the parser", "cwd": "/tmp"})
+        second = process_hook({"prompt": "  write TESTS for the parser", "cwd": "/tmp"})
+
+        assert mock_pattern_search.call_count == 1
+        assert second == first
+
+    def test_empty_result_not_cached(self, mock_pattern_search, mock_get_project_name):
+        """Test that an empty (possibly timed-out) search is retried next time."""
+        mock_pattern_search.return_value = []
+
+        from lesson_injector import process_hook
+
+        process_hook({"prompt": "help", "cwd": "/tmp"})
+        process_hook({"prompt": "help", "cwd": "/tmp"})
+
+        assert mock_pattern_search.call_count == 2
+
+    def test_stale_entry_served_and_refreshed_in_background(
+        self, mock_pattern_search, mock_get_project_name, lesson_cache, high_confidence_patterns
+    ):
+        """Test that a stale entry is still injected while a background search refreshes it."""
+        lesson_cache.write_text(json.dumps({"deploy steps": {"ts": 0, "patterns": high_confidence_patterns}}))
+
+        import lesson_injector
+
+        with patch("lesson_injector._refresh_in_background") as refresh:
+            result = lesson_injector.process_hook({"prompt": "Deploy steps", "cwd": "/tmp"})
+
+        refresh.assert_called_once_with("Deploy steps")
+        mock_pattern_search.assert_not_called()
+        assert "Always run tests before committing" in result["additionalContext"]
@@ -34,6 +34,23 @@ from meta_learning import (  # type: ignore  # noqa: E402
 # =============================================================================
 
 
+@pytest.fixture(autouse=True)
+def clear_loader_caches():
+    """Reset memoized loaders so each test sees its own patched inputs."""
+    import meta_learning
+
+    loaders = (
+        meta_learning.load_trajectory_data,
+        meta_learning.load_session_analysis,
+        meta_learning.load_file_edit_counts,
+    )
+    for loader in loaders:
+        loader.cache_clear()
+    yield
+    for loader in loaders:
+        loader.cache_clear()
+
+
 @pytest.fixture
 def mock_trajectory_index() -> list[dict[str, Any]]:
     """Sample trajectory index data."""
@@ -307,8 +324,34 @@ class TestPatternStoredWithConfidence:
         assert call_args[0][2] == 0.85  # confidence
 
     @patch("meta_learning.pattern_store")
-    def test_multiple_patterns_all_stored(self, mock_pattern_store: MagicMock) -> None:
-        """Test that all extracted patterns are stored."""
+    @patch("meta_learning.pattern_store_batch")
+    def test_multiple_patterns_all_stored(
+        self, mock_pattern_store_batch: MagicMock, mock_pattern_store: MagicMock
+    ) -> None:
+        """Test that all extracted patterns are stored in one batch call."""
+        mock_pattern_store_batch.return_value = [{"success": True}, {"success": True}]
+
+        patterns = [
+            {"type": "high_rework", "files": ["main.py"], "confidence": 0.85},
+            {"type": "high_error", "error_rate": 0.30, "confidence": 0.90},
+        ]
+
+        from meta_learning import store_patterns
+
+        store_patterns(patterns)
+
+        mock_pattern_store_batch.assert_called_once()
+        items = mock_pattern_store_batch.call_args[0][0]
+        assert [item[1] for item in items] == ["high_rework", "high_error"]
+        mock_pattern_store.assert_not_called()
+
+    @patch("meta_learning.pattern_store")
+    @patch("meta_learning.pattern_store_batch")
+    def test_failed_batch_falls_back_to_per_pattern(
+        self, mock_pattern_store_batch: MagicMock, mock_pattern_store: MagicMock
+    ) -> None:
+        """Test that a failed batch call stores patterns one by one."""
+        mock_pattern_store_batch.side_effect = RuntimeError("batch unavailable")
         mock_pattern_store.return_value = {"success": True}
 
         patterns = [
@@ -322,6 +365,27 @@ class TestPatternStoredWithConfidence:
 
         assert mock_pattern_store.call_count == 2
 
+    @patch("meta_learning.pattern_store")
+    @patch("meta_learning.pattern_store_batch")
+    def test_failed_batch_items_stored_one_by_one(
+        self, mock_pattern_store_batch: MagicMock, mock_pattern_store: MagicMock
+    ) -> None:
+        """Test that only the items the batch failed to store are retried."""
+        mock_pattern_store_batch.return_value = [{"success": True}, {"success": False, "output": "timeout"}]
+        mock_pattern_store.return_value = {"success": True}
+
+        patterns = [
+            {"type": "high_rework", "files": ["main.py"], "confidence": 0.85},
+            {"type": "high_error", "error_rate": 0.30, "confidence": 0.90},
+        ]
+
+        from meta_learning import store_patterns
+
+        store_patterns(patterns)
+
+        mock_pattern_store.assert_called_once()
+        assert mock_pattern_store.call_args[0][1] == "high_error"
+
 
 # =============================================================================
 # Test calculate_confidence
@@ -541,6 +605,24 @@ class TestMainFunction:
 
         assert result == 0
 
+    @patch("meta_learning.pattern_store")
+    @patch("meta_learning.memory_retrieve")
+    def test_main_reads_trajectory_index_once(
+        self,
+        mock_memory_retrieve: MagicMock,
+        mock_pattern_store: MagicMock,
+    ) -> None:
+        """Test main reuses the trajectory index for quality scores."""
+        mock_memory_retrieve.return_value = [{"id": "traj-001", "success": True, "steps": 2}]
+        mock_pattern_store.return_value = {"success": True}
+
+        with patch("sys.stdin.isatty", return_value=True):
+            import meta_learning
+
+            meta_learning.main()
+
+        assert mock_memory_retrieve.call_count == 1
+
     @patch("meta_learning.memory_retrieve")
     def test_main_returns_zero_on_error(self, mock_memory_retrieve: MagicMock) -> None:
         """Test main returns 0 even on errors (graceful failure)."""
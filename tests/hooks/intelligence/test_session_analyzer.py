@@ -20,6 +20,7 @@ from session_analyzer import (  # type: ignore  # noqa: E402
     GitChanges,
     SessionMetrics,
     Suggestion,
+    _iter_numstat_z,
     categorize_file,
     format_session_stats,
     format_suggestions,
@@ -60,6 +61,29 @@ class TestGitChanges:
         assert changes.code_files == ["src/main.py"]
 
 
+# =============================================================================
+# Numstat Parsing Tests
+# =============================================================================
+
+
+class TestParseNumstat:
+    """Tests for `git diff --numstat -z` parsing."""
+
+    def test_empty_output(self) -> None:
+        """Test no changes."""
+        assert list(_iter_numstat_z("")) == []
+
+    def test_files_and_line_counts(self) -> None:
+        """Test paths and counts are parsed, binary counts reported as 0."""
+        output = "3\t1\tsrc/main.py\x00-\t-\tlogo.png\x00"
+        assert list(_iter_numstat_z(output)) == [("src/main.py", 3, 1), ("logo.png", 0, 0)]
+
+    def test_rename_keeps_new_path(self) -> None:
+        """Test renamed files are reported under their new path."""
+        output = "2\t0\t\x00old.py\x00new.py\x001\t1\tREADME.md\x00"
+        assert list(_iter_numstat_z(output)) == [("new.py", 2, 0), ("README.md", 1, 1)]
+
+
 # =============================================================================
 # SessionMetrics Tests
 # =============================================================================
@@ -0,0 +1,113 @@
+"""Unit tests for strategy-router hook."""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add hooks to path for import
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "hooks" / "intelligence"))
+
+import strategy_router  # type: ignore  # noqa: E402
+from strategy_router import _DIRECTIVE_TABLE, Phase, get_phase_and_directive  # type: ignore  # noqa: E402
+
+
+@pytest.fixture
+def metrics_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the router at an empty metrics dir and a fresh gh cache."""
+    monkeypatch.setattr(strategy_router, "METRICS", tmp_path)
+    monkeypatch.setattr(strategy_router, "CACHE_FILE", tmp_path / "gh_cache.json")
+    monkeypatch.setattr(strategy_router, "EDITS_DB", tmp_path / "edits.db")
+    monkeypatch.setattr(strategy_router, "FILE_EDITS_FILE", tmp_path / "file_edits.json")
+    monkeypatch.setattr(strategy_router, "_gh_cache", None)
+    return tmp_path
+
+
+def directive(metrics_dir: Path, pr=None, ci=None, state=None, edits=None) -> tuple[Phase, str | None]:
+    """Run get_phase_and_directive with the given gh results and metrics files."""
+    if state is not None:
+        (metrics_dir / "session_state.json").write_text(strategy_router.fastjson.dumps(state).decode())
+    if edits is not None:
+        (metrics_dir / "file_edits.json").write_text(strategy_router.fastjson.dumps(edits).decode())
+    with patch.object(strategy_router, "get_github_state", return_value=(pr, ci)):
+        return get_phase_and_directive()
+
+
+class TestDirectiveTable:
+    """Tests for the precomputed directive table."""
+
+    def test_covers_every_combination(self) -> None:
+        """Every combination of the five conditions has an entry."""
+        assert len(_DIRECTIVE_TABLE) == 32
+
+    def test_no_condition_no_directive(self) -> None:
+        """Nothing applies, nothing to say."""
+        assert _DIRECTIVE_TABLE[(False,) * 5] is None
+
+    def test_highest_priority_wins(self) -> None:
+        """The first true condition picks the directive."""
+        assert _DIRECTIVE_TABLE[(True,) * 5](1, ["a.py"]).startswith("[TEST]")
+        assert _DIRECTIVE_TABLE[(False, False, False, True, True)](1, ["a.py"]).startswith("[DEV]")
+
+
+class TestGetPhaseAndDirective:
+    """Tests for phase inference and directive selection."""
+
+    def test_quiet_session(self, metrics_dir: Path) -> None:
+        """No PR, no CI, no errors: DEV with no directive."""
+        assert directive(metrics_dir) == (Phase.DEV, None)
+
+    def test_ci_failing_without_pr(self, metrics_dir: Path) -> None:
+        """Failing CI with no PR asks to fix CI."""
+        ci = [{"status": "completed", "conclusion": "failure"}]
+        assert directive(metrics_dir, ci=ci) == (Phase.TEST, "[TEST] CI failing → git stash && fix CI")
+
+    def test_changes_requested(self, metrics_dir: Path) -> None:
+        """Changes requested outranks the error rate."""
+        pr = {"number": 7, "state": "OPEN", "reviewDecision": "CHANGES_REQUESTED"}
+        state = {"errors": 5, "tool_calls": 12}
+        assert directive(metrics_dir, pr=pr, state=state)[1] == "[REVIEW] PR #7 blocked → address comments"
+
+    def test_high_error_rate(self, metrics_dir: Path) -> None:
+        """25%+ errors over 10+ calls suggests a checkpoint."""
+        state = {"errors": 5, "tool_calls": 12}
+        assert directive(metrics_dir, state=state)[1] == "[DEBUG] Error rate 25%+ → /undo:checkpoint"
+
+    def test_thrashing(self, metrics_dir: Path) -> None:
+        """A file reworked 5x+ is named in the directive."""
+        edits = {"/repo/src/app.py": {"rework_count": 5}}
+        assert directive(metrics_dir, edits=edits)[1] == "[DEV] app.py edited 5x+ → step back"
+
+    def test_thrashing_from_edits_db(self, metrics_dir: Path) -> None:
+        """edits.db takes precedence over the legacy file_edits.json."""
+        with sqlite3.connect(metrics_dir / "edits.db") as conn:
+            conn.execute("CREATE TABLE edits (path TEXT PRIMARY KEY, last_edit REAL, rework_count INTEGER)")
+            conn.execute("INSERT INTO edits VALUES ('/repo/src/db.py', 0, 6), ('/repo/src/ok.py', 0, 1)")
+        conn.close()
+        edits = {"/repo/src/app.py": {"rework_count": 5}}
+        assert directive(metrics_dir, edits=edits)[1] == "[DEV] db.py edited 5x+ → step back"
+
+    def test_awaiting_review(self, metrics_dir: Path) -> None:
+        """An open PR awaiting review is in REVIEW."""
+        pr = {"number": 3, "state": "OPEN", "reviewDecision": "REVIEW_REQUIRED"}
+        assert directive(metrics_dir, pr=pr) == (Phase.REVIEW, "[REVIEW] PR #3 → awaiting review")
+
+
+class TestGhCache:
+    """Tests for the gh_cache.json file cache."""
+
+    def test_cache_is_per_repo(self, metrics_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """A result cached in one checkout is not served in another."""
+        monkeypatch.setattr(strategy_router, "_repo_root", lambda: "/repo/a")
+        strategy_router._cache_store(strategy_router._cache_key(strategy_router.PR_CMD), {"number": 1})
+        assert strategy_router._cache_lookup(strategy_router._cache_key(strategy_router.PR_CMD), 30) == (
+            True,
+            {"number": 1},
+        )
+
+        monkeypatch.setattr(strategy_router, "_repo_root", lambda: "/repo/b")
+        assert strategy_router._cache_lookup(strategy_router._cache_key(strategy_router.PR_CMD), 30) == (False, None)